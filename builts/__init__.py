@@ -4,17 +4,23 @@ import weakref
 import os
 from collections import OrderedDict
 from collections.abc import Mapping
+from operator import itemgetter
 import inspect
 import warnings
 
-from ..utilities import Grouper, make_hash, w_hash
-from .. import wordhash
+import numpy as np
+
+from ..utilities import Grouper, make_hash, w_hash, english_hash, proper_hash
+from .. import utilities
 from .. import disk
 from ..weaklist import WeakList
 from ..anchor import Anchor, _namepath_process, NoActiveAnchorError
 from ..globevars import _BUILTTAG_, _CLASSTAG_, _GHOSTTAG_
 from ..pyklet import Pyklet
 from ..vectors import SchemaIterator
+from ..cache import DiskCache, LRUCache, CacheMiss, digest
+from ..hashing import content_hash
+from ..scripts import ClassScript
 
 from ..exceptions import EverestException
 class BuiltException(EverestException):
@@ -25,24 +31,276 @@ class MissingAttribute(BuiltException):
     pass
 class MissingKwarg(BuiltException):
     pass
+class ScriptChangedError(BuiltException):
+    '''The source of a class has changed since the class was defined.'''
+    pass
 class NotOnDiskError(EverestException):
     '''That hashID could not be found at the provided location.'''
     pass
 
-# BUFFERSIZE = 5 * 2 ** 30 # i.e. 5 GiB
-# def buffersize_exceeded():
-#     nbytes = 0
-#     for builtID, built in sorted(Meta._prebuilts.items()):
-#         nbytes += built.nbytes
-#     return nbytes > BUFFERSIZE
+class MemoryGovernor:
+    '''
+    Keeps a running total of the outputs buffered in memory by all \
+    live producers. Whenever the total exceeds 'budget' bytes, \
+    buffers are saved to the active anchor and cleared - \
+    largest first, or least recently stored first if policy is \
+    'oldest' - until it no longer does. With no anchor active, \
+    nothing is saved and the buffers are left alone. \
+    Outputs spilled to scratch files (see Producer.spill) \
+    are not held in RAM, and so are not counted.
+    '''
+    def __init__(self, budget = None, policy = 'largest'):
+        self.budget, self.policy = budget, policy
+        # id(producer) -> [weakref to producer, nbytes], least recent first;
+        # not hashID, which unique copies share:
+        self._entries = OrderedDict()
+        self.nbytes = 0
+        self.evictions = 0
+        self._checking = False
+    def update(self, producer):
+        key = id(producer)
+        try:
+            ref, nbytes = self._entries.pop(key)
+            self.nbytes -= nbytes
+        except KeyError:
+            ref = weakref.ref(producer, lambda _: self._forget(key))
+        nbytes = producer.ramnbytes
+        if nbytes:
+            self._entries[key] = [ref, nbytes]
+            self.nbytes += nbytes
+    def _forget(self, key):
+        try:
+            _, nbytes = self._entries.pop(key)
+            self.nbytes -= nbytes
+        except KeyError:
+            pass
+    def check(self):
+        if self.budget is None or self._checking:
+            return
+        if self.nbytes <= self.budget:
+            return
+        try:
+            Anchor.get_active()
+        except NoActiveAnchorError:
+            return
+        entries = list(self._entries.values())
+        if self.policy == 'largest':
+            entries.sort(key = lambda entry: entry[1], reverse = True)
+        elif not self.policy == 'oldest':
+            raise ValueError(self.policy)
+        self._checking = True
+        try:
+            for ref, nbytes in entries:
+                if self.nbytes <= self.budget:
+                    break
+                producer = ref()
+                if producer is None:
+                    continue
+                producer.save(silent = True)
+                self.evictions += 1
+        finally:
+            self._checking = False
+    @property
+    def usage(self):
+        return dict(
+            nbytes = self.nbytes,
+            budget = self.budget,
+            policy = self.policy,
+            evictions = self.evictions,
+            producers = [
+                (ref().hashID, nbytes) \
+                    for ref, nbytes in self._entries.values() \
+                        if not ref() is None
+                ],
+            )
+
+def _default_buffersize():
+    try:
+        return int(os.environ['EVEREST_BUFFERSIZE'])
+    except KeyError:
+        return None
+
+def set_memory_budget(nbytes = None, policy = 'largest'):
+    '''
+    Bounds the outputs that live producers may buffer in memory, \
+    in bytes (None for no bound); see MemoryGovernor.
+    '''
+    Meta._governor.budget, Meta._governor.policy = nbytes, policy
+    Meta._governor.check()
+def memory_usage():
+    return Meta._governor.usage
+
+def set_cache(maxsize = 256, maxbytes = 2 ** 30):
+    '''
+    Bounds the cache of strong references that keeps recently used \
+    builts (and their buffered outputs) alive after user code drops them. \
+    Either bound may be None; set maxsize to zero to disable the cache. \
+    The cache is off until this is called, so that by default \
+    a built is freed as soon as it is dropped.
+    '''
+    Meta._recent.resize(maxsize, maxbytes)
+def cache_stats():
+    return Meta._recent.stats
+
+def touch_builts(builts, name = None, path = None):
+    '''
+    Writes many builts to the frame in one locked transaction, \
+    merging their local, root and global objects first.
+    '''
+    conds = [o is None for o in (name, path)]
+    if any(conds) and not all(conds):
+        raise ValueError
+    if not any(conds):
+        with Anchor(name, path):
+            _touch_builts(builts)
+    else:
+        _touch_builts(builts)
+def _merge_objects(target, source):
+    for key, val in source.items():
+        if isinstance(val, Mapping) and isinstance(target.get(key), Mapping):
+            _merge_objects(target[key], val)
+        elif isinstance(val, Mapping):
+            target[key] = dict()
+            _merge_objects(target[key], val)
+        else:
+            target[key] = val
+def _touch_builts(builts):
+    man = Anchor.get_active()
+    builts = list(OrderedDict((built.hashID, built) for built in builts).values())
+    localObjects, rootObjects, globalObjects = dict(), dict(), dict()
+    for built in builts:
+        for fn in built._pre_anchor_fns: fn()
+        localObjects.setdefault(built.typeHash, dict())[built.inputsHash] = \
+            built.localObjects
+        _merge_objects(rootObjects, built.rootObjects)
+        _merge_objects(globalObjects, built.globalObjects)
+    with disk.H5Wrap(man.writer):
+        for cls in OrderedDict((type(built), None) for built in builts):
+            cls._touch_class()
+        man.writer.add_dict(localObjects)
+        man.rootwriter.add_dict(rootObjects)
+        man.globalwriter.add_dict(globalObjects)
+    for built in builts:
+        for fn in built._post_anchor_fns: fn()
 
 def load_built(hashID, name, path = '.'):
     with Anchor(name, path):
         return BuiltProxy(_BUILTTAG_ + hashID).realised
+def load_builts(hashIDs, name, path = '.'):
+    '''
+    Loads many builts from one frame, in the order given. \
+    The inputs and class scripts of all builts not already in memory \
+    are read in a single session, then decoded and constructed \
+    in the calling thread, since decoding may read from the frame again.
+    '''
+    hashIDs = list(hashIDs)
+    with Anchor(name, path) as anchor:
+        reader = anchor.reader
+        with disk.H5Wrap(reader):
+            toLoad = sorted(set(
+                hashID for hashID in hashIDs \
+                    if not hashID in Meta._prebuilts
+                ))
+            typeHashes = sorted(set(
+                hashID.split(':')[0] for hashID in toLoad
+                ))
+            scriptKeys = {
+                typeHash: '/' + '/'.join([typeHash, _CLASSTAG_]) \
+                    for typeHash in typeHashes \
+                        if not typeHash in Meta._preclasses
+                }
+            inputsKeys = {
+                hashID: '/' + '/'.join([*hashID.split(':'), 'inputs']) \
+                    for hashID in toLoad
+                }
+            raw = reader._seek_many(
+                [*scriptKeys.values(), *inputsKeys.values()]
+                )
+            for hashID, key in sorted(inputsKeys.items()):
+                if not key in raw:
+                    raise NotOnDiskError(hashID)
+            decoded = {
+                key: reader._seekresolve(val) for key, val in raw.items()
+                }
+            for typeHash, key in sorted(scriptKeys.items()):
+                clsproxy = ClassProxy(_CLASSTAG_ + typeHash)
+                if key in decoded:
+                    clsproxy.script = decoded[key]
+                clsproxy.realised
+            out = []
+            for hashID in hashIDs:
+                typeHash, inputsHash = hashID.split(':')
+                cls = ClassProxy(_CLASSTAG_ + typeHash).realised
+                try:
+                    obj = cls._get_prebuilt(inputsHash)
+                except KeyError:
+                    obj = cls(**decoded[inputsKeys[hashID]])
+                out.append(obj)
+    return out
 def load_class(typeHash, name, path = '.'):
     with Anchor(name, path):
         return ClassProxy(_CLASSTAG_ + typeHash).realised
 
+_STAMPCACHE = DiskCache('scriptstamps')
+_SCRIPTCACHE = DiskCache('scripts')
+_TYPEHASHCACHE = DiskCache('typehashes')
+
+def _read_script(filepath):
+    with open(filepath) as file:
+        return file.read()
+
+def _file_stamp(filepath):
+    stat = os.stat(filepath)
+    return (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+
+_INPUTKEYSCACHE = DiskCache('inputkeys')
+_PLAINTYPES = frozenset([str, int, float, bool, bytes, complex, type(None)])
+def _is_plain(obj):
+    # Whether a default input value survives pickling unchanged.
+    if type(obj) in _PLAINTYPES:
+        return True
+    elif type(obj) in (tuple, list, frozenset):
+        return all(_is_plain(sub) for sub in obj)
+    elif type(obj) in (dict, OrderedDict):
+        return all(_is_plain(k) and _is_plain(v) for k, v in obj.items())
+    return False
+
+class _Unfingerprintable(Exception):
+    pass
+_FINGERPRINTSCALARS = frozenset([str, int, bool, bytes, complex, type(None)])
+def _fingerprint(obj):
+    # A cheap canonical stand-in for an input value: equal fingerprints
+    # must imply equal input hashes (but not necessarily the reverse).
+    objType = type(obj)
+    if objType in _FINGERPRINTSCALARS:
+        return objType, obj
+    elif objType is float:
+        return float, repr(obj)
+    elif objType in (tuple, list):
+        return objType, tuple(_fingerprint(sub) for sub in obj)
+    elif isinstance(obj, (Built, BuiltProxy)):
+        return Built, obj.hashID
+    elif isinstance(obj, (Meta, ClassProxy)):
+        return Meta, obj.typeHash
+    elif isinstance(obj, Pyklet):
+        return objType, obj.hashID
+    elif isinstance(obj, Mapping):
+        try:
+            # keys are fingerprinted too: 1, 1. and True are equal keys
+            # but give different input hashes
+            return dict, tuple(
+                (_fingerprint(k), _fingerprint(v))
+                    for k, v in sorted(obj.items(), key = itemgetter(0))
+                )
+        except TypeError:
+            raise _Unfingerprintable
+    elif isinstance(obj, np.ndarray):
+        return np.ndarray, content_hash(obj)
+    elif isinstance(obj, np.generic):
+        return objType, repr(obj)
+    else:
+        raise _Unfingerprintable
+
 def _get_default_inputs(func):
     parameters = inspect.signature(func).parameters
     out = parameters.copy()
@@ -109,6 +367,12 @@ class Meta(type):
 
     _preclasses = weakref.WeakValueDictionary()
     _prebuilts = weakref.WeakValueDictionary()
+    # input fingerprint -> hashID, for live builts only:
+    _fingerprints = dict()
+    # strong references to recently used builts (none until set_cache):
+    _recent = LRUCache(0, None, lambda obj: getattr(obj, 'nbytes', 0))
+    # the process-wide budget for buffered outputs:
+    _governor = MemoryGovernor(_default_buffersize())
 
     _hashDepth = 2
 
@@ -116,37 +380,102 @@ class Meta(type):
 
     @classmethod
     def _type_hash(cls, arg):
-        rawHash = make_hash(arg)
-        neatHash = wordhash.get_random_proper(
-            cls._hashDepth,
-            randomseed = rawHash
-            )
+        if type(arg) is str:
+            key = (digest(arg), cls._hashDepth, utilities.LEGACYIDS)
+            try:
+                return _TYPEHASHCACHE[key]
+            except CacheMiss:
+                pass
+        neatHash = proper_hash(arg, cls._hashDepth)
+        if type(arg) is str:
+            _TYPEHASHCACHE[key] = neatHash
         return neatHash
 
+    @classmethod
+    def _file_type_hash(cls, filepath):
+        # Keyed on the file stamp so that an unchanged source file
+        # is neither read nor hashed again, in this or any other process.
+        # Returns the script too if it had to be read, else None.
+        stamp = (*_file_stamp(filepath), cls._hashDepth, utilities.LEGACYIDS)
+        try:
+            return (*_STAMPCACHE[stamp], None)
+        except CacheMiss:
+            script = _read_script(filepath)
+            out = digest(script), cls._type_hash(script)
+            # kept for classes defined later from the stamp alone:
+            _SCRIPTCACHE[out[0]] = script
+            _STAMPCACHE[stamp] = out
+            return (*out, script)
+
+    @property
+    def script(cls):
+        try:
+            return cls.__dict__['_script']
+        except KeyError:
+            pass
+        # The stamp was unchanged when the class was defined,
+        # so the file still holds that script unless edited since,
+        # in which case the copy saved with the stamp is used:
+        script = _read_script(cls._scriptPath)
+        if not digest(script) == cls._scriptDigest:
+            try:
+                script = _SCRIPTCACHE[cls._scriptDigest]
+            except CacheMiss:
+                raise ScriptChangedError(cls.__name__, cls._scriptPath)
+        cls._script = script
+        return script
+
     def __new__(cls, name, bases, dic):
         outCls = super().__new__(cls, name, bases, dic)
+        filepath = inspect.getfile(outCls)
         if hasattr(outCls, '_swapscript'):
             script = outCls._swapscript
         else:
-            script = disk.ToOpen(inspect.getfile(outCls))()
-        typeHash = Meta._type_hash(script)
+            script = disk.INLINESCRIPTS.get(os.path.abspath(filepath))
+        if script is None:
+            scriptDigest, typeHash, script = Meta._file_type_hash(filepath)
+        else:
+            scriptDigest, typeHash = digest(script), Meta._type_hash(script)
         try:
             outCls = cls._preclasses[typeHash]
-            assert outCls.script == script
+            assert outCls._scriptDigest == scriptDigest
             return outCls
         except KeyError:
             outCls.typeHash = typeHash
-            outCls.script = script
-            outCls.defaultInps = _get_default_inputs(outCls.__init__)
-            try:
-                outCls._sortedInputKeys, outCls._sortedGhostKeys = \
-                    sort_inputKeys(outCls.__init__)
-            except ValueError:
-                outCls._sortedInputKeys, outCls._sortedGhostKeys = {}, {}
+            outCls._scriptPath = filepath
+            outCls._scriptDigest = scriptDigest
+            if not script is None:
+                outCls._script = script
+            outCls.defaultInps, outCls._sortedInputKeys, \
+                outCls._sortedGhostKeys = Meta._input_keys(outCls)
             outCls._custom_cls_fn()
             cls._preclasses[outCls.typeHash] = outCls
             return outCls
 
+    @staticmethod
+    def _input_keys(cls):
+        # Keyed on the typeHash so that source inspection only happens
+        # the first time a given class script is seen on this machine;
+        # an inherited __init__ lies outside that script, so is not cached.
+        key = (cls.typeHash, cls.__qualname__)
+        try:
+            if not '__init__' in cls.__dict__:
+                raise CacheMiss(key)
+            defaultInps, inputKeys, ghostKeys = _INPUTKEYSCACHE[key]
+        except CacheMiss:
+            defaultInps = _get_default_inputs(cls.__init__)
+            try:
+                inputKeys, ghostKeys = sort_inputKeys(cls.__init__)
+            except ValueError:
+                inputKeys, ghostKeys = {}, {}
+            if '__init__' in cls.__dict__ \
+                    and all(_is_plain(val) for val in defaultInps.values()):
+                _INPUTKEYSCACHE[key] = defaultInps, inputKeys, ghostKeys
+        return \
+            OrderedDict(defaultInps), \
+            OrderedDict(inputKeys), \
+            OrderedDict(ghostKeys)
+
     @staticmethod
     def _align_inputs(cls, *args, **kwargs):
         inputs = cls.defaultInps.copy()
@@ -155,24 +484,99 @@ class Meta(type):
             inputs[key] = arg
         return inputs
 
+    @staticmethod
+    def _inputs_fingerprint(cls, inputs, memo = None):
+        # The optional memo (id -> fingerprint) is only safe while
+        # every value it was filled from is kept alive by the caller.
+        ghostKeys = cls._sortedGhostKeys['all']
+        if memo is None:
+            fingerprint = _fingerprint
+        else:
+            def fingerprint(v):
+                try:
+                    return memo[id(v)]
+                except KeyError:
+                    out = memo[id(v)] = _fingerprint(v)
+                    return out
+        try:
+            return (
+                cls.typeHash,
+                utilities.LEGACYIDS,
+                tuple(
+                    (k, fingerprint(v)) for k, v in sorted(inputs.items())
+                        if not k in ghostKeys
+                    ),
+                )
+        except _Unfingerprintable:
+            return None
+
     def __call__(cls, *args, unique = False, **kwargs):
         inputs = Meta._align_inputs(cls, *args, **kwargs)
-        obj = cls.__new__(cls, **inputs)
         if unique:
+            obj = cls.__new__(cls, **inputs)
             obj.__init__(**obj.inputs)
             return obj
-        else:
+        return cls._build(inputs, Meta._inputs_fingerprint(cls, inputs))
+
+    def _build(cls, inputs, fingerprint):
+        if not fingerprint is None:
             try:
-                obj = cls._get_prebuilt(obj.inputsHash)
-                # warnings.warn("Loading pre-built object.")
+                return cls._get_built(cls._fingerprints[fingerprint])
             except KeyError:
-                cls._prebuilts[obj.hashID] = obj
-                obj.__init__(**obj.inputs)
+                pass
+        obj = cls.__new__(cls, **inputs)
+        try:
+            obj = cls._get_prebuilt(obj.inputsHash)
+            # warnings.warn("Loading pre-built object.")
+        except KeyError:
+            cls._prebuilts[obj.hashID] = obj
+            obj.__init__(**obj.inputs)
+            cls._recent[obj.hashID] = obj
+        if not (fingerprint is None or fingerprint in cls._fingerprints):
+            cls._fingerprints[fingerprint] = obj.hashID
+            weakref.finalize(obj, cls._fingerprints.pop, fingerprint, None)
+        return obj
+
+    def _get_built(cls, hashID):
+        try:
+            return cls._recent[hashID]
+        except KeyError:
+            obj = cls._prebuilts[hashID]
+            cls._recent[hashID] = obj
             return obj
 
     def __getitem__(cls, arg):
         return SchemaIterator(cls, arg)
 
+    def build_many(cls, vectors):
+        '''
+        Builds (or retrieves) one built per input vector, in order. \
+        All vectors are fingerprinted in one pass first, each distinct \
+        input value only once however many vectors share it; \
+        each distinct fingerprint is then looked up or constructed once.
+        '''
+        inputsList = [Meta._align_inputs(cls, **vector) for vector in vectors]
+        memo = dict()
+        prints = [
+            Meta._inputs_fingerprint(cls, inputs, memo)
+                for inputs in inputsList
+            ]
+        out, byPrint = [], dict()
+        for inputs, fingerprint in zip(inputsList, prints):
+            if fingerprint is None:
+                out.append(cls._build(inputs, None))
+                continue
+            try:
+                obj = byPrint[fingerprint]
+            except KeyError:
+                obj = byPrint[fingerprint] = cls._build(inputs, fingerprint)
+            out.append(obj)
+        return out
+    def touch_many(cls, vectors, name = None, path = None):
+        builts = cls.build_many(vectors)
+        touch_builts(builts, name, path)
+        return builts
+
 # class O:
 #     def __init__(self, cls):
 #         self.cls = cls
@@ -193,12 +597,7 @@ class Built(metaclass = Meta):
 
     @classmethod
     def _inputs_hash(cls, arg):
-        rawHash = make_hash(arg)
-        neatHash = wordhash.get_random_english(
-            cls._hashDepth,
-            randomseed = rawHash
-            )
-        return neatHash
+        return english_hash(arg, cls._hashDepth)
     @classmethod
     def _process_inputs(cls, inputs):
         for key, val in sorted(inputs.items()):
@@ -228,8 +627,7 @@ class Built(metaclass = Meta):
 
     @classmethod
     def _get_prebuilt(cls, inputsHash):
-        k = ':'.join([cls.typeHash, inputsHash])
-        return cls._prebuilts[k]
+        return cls._get_built(':'.join([cls.typeHash, inputsHash]))
 
     def __new__(cls, **inputs):
 
@@ -242,7 +640,6 @@ class Built(metaclass = Meta):
         obj.hashID = ':'.join([obj.typeHash, obj.inputsHash])
 
         obj.rootObjects = {
-            cls.typeHash: {_CLASSTAG_: cls.script}
             }
         obj.globalObjects = {
             # 'classes': {cls.typeHash: cls}
@@ -316,9 +713,14 @@ class Built(metaclass = Meta):
     @disk.h5filewrap
     def _touch(self):
         for fn in self._pre_anchor_fns: fn()
-        self.writer.add_dict(self.localObjects)
-        self.rootwriter.add_dict(self.rootObjects)
-        self.globalwriter.add_dict(self.globalObjects)
+        # What a built writes is fixed at construction,
+        # so once the frame holds it, touching costs one lookup:
+        if not '/'.join(['', self.typeHash, self.inputsHash, 'hashID']) \
+                in self.man.writer:
+            type(self)._touch_class()
+            self.writer.add_dict(self.localObjects)
+            self.rootwriter.add_dict(self.rootObjects)
+            self.globalwriter.add_dict(self.globalObjects)
         for fn in self._post_anchor_fns: fn()
     @classmethod
     def touch_class(cls, name = None, path = None):
@@ -332,11 +734,21 @@ class Built(metaclass = Meta):
             cls._touch_class()
     @classmethod
     def _touch_class(cls):
+        # The script itself goes to the script store (see everest.scripts);
+        # once the frame refers to it, touching costs one lookup.
         man = cls.__class__._anchorManager.get_active()
-        man.writer.add_dict({cls.typeHash: {_CLASSTAG_: cls.script}})
+        with disk.H5Wrap(man.writer):
+            if not '/'.join(['', cls.typeHash, _CLASSTAG_]) in man.writer:
+                man.writer.add_dict(
+                    {cls.typeHash: {_CLASSTAG_: ClassScript(cls)}}
+                    )
 
     def __hash__(self):
-        return int(make_hash(self.hashID))
+        try:
+            return self._builtHash
+        except AttributeError:
+            self._builtHash = hash(int(make_hash(self.hashID)))
+            return self._builtHash
 
     def __eq__(self, arg):
         return self.hashID == arg
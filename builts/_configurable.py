@@ -170,14 +170,17 @@ class MutableConfigs(Configs):
                 self.contents[k] = arg2
         else:
             raise ValueError
+        self._invalidate_hash()
     def clear(self):
         self.contents.update(self.defaults)
+        self._invalidate_hash()
     def update(self, inDict):
         for k, v in inDict.items():
             self[k] = v
     def update_generic(self, *args, **kwargs):
         self.contents.clear()
         self.contents.update(self._align_inputs(*args, **kwargs))
+        self._invalidate_hash()
     def copy(self):
         return type(self)(
             defaults = self.defaults,
@@ -3,6 +3,7 @@ from collections import OrderedDict, namedtuple
 import numpy as np
 
 from ._producer import Producer, LoadFail, OutsNull
+from .. import disk
 from ..comparator import Comparator, Prop
 from ..anchor import NoActiveAnchorError
 from ..reader import PathNotInFrameError
@@ -29,6 +30,81 @@ def _indexer_load_wrapper(func):
         return func(self, index, *args, **kwargs)
     return wrapper
 
+def _as_records(columns, others):
+    # Aligned columns as one array that compares row-wise,
+    # with dtypes promoted to match the 'others' columns.
+    columns = [
+        np.asarray(c, dtype = np.result_type(c, o)) \
+            for c, o in zip(columns, others)
+        ]
+    if len(columns) == 1:
+        return columns[0]
+    return np.rec.fromarrays(columns, names = [
+        'f' + str(i) for i in range(len(columns))
+        ])
+
+class JointIndex:
+    '''
+    Maps the aligned indexer columns of one output subkey to rows, \
+    answering range and bounded-maximum queries by binary search. \
+    Each column is argsorted (and kept sorted) once, on first use.
+    '''
+    def __init__(self, columns):
+        self.columns = OrderedDict(
+            (k, np.asarray(v)) for k, v in columns.items()
+            )
+        self._orders = dict()
+        self._sortedColumns = dict()
+        self._prefixRows = dict()
+    def __len__(self):
+        for v in self.columns.values():
+            return len(v)
+        return 0
+    def _order(self, key):
+        try:
+            return self._orders[key]
+        except KeyError:
+            order = self.columns[key].argsort(kind = 'stable')
+            self._orders[key] = order
+            return order
+    def _sorted(self, key):
+        try:
+            return self._sortedColumns[key]
+        except KeyError:
+            column = self.columns[key][self._order(key)]
+            self._sortedColumns[key] = column
+            return column
+    def within(self, key, lo = None, hi = None):
+        '''
+        Returns the rows, ascending, at which 'key' lies in [lo, hi].
+        '''
+        order, column = self._order(key), self._sorted(key)
+        start = 0 if lo is None else np.searchsorted(column, lo, 'left')
+        stop = len(column) if hi is None \
+            else np.searchsorted(column, hi, 'right')
+        return np.sort(order[start : stop])
+    def latest(self, key, bound, by):
+        '''
+        Returns the row with the greatest 'by' among those \
+        at which 'key' is at most 'bound'; raises ValueError if none.
+        '''
+        order = self._order(key)
+        pos = np.searchsorted(self._sorted(key), bound, 'right')
+        if not pos:
+            raise ValueError(bound)
+        try:
+            prefixRows = self._prefixRows[key, by]
+        except KeyError:
+            # position in 'order' of the running maximum of 'by':
+            byColumn = self.columns[by][order]
+            positions = np.arange(len(order))
+            isMax = byColumn >= np.maximum.accumulate(byColumn)
+            prefixRows = order[np.maximum.accumulate(
+                np.where(isMax, positions, 0)
+                )]
+            self._prefixRows[key, by] = prefixRows
+        return int(prefixRows[pos - 1])
+
 class Indexer(Producer):
 
     def __init__(self,
@@ -38,6 +114,9 @@ class Indexer(Producer):
             *self.indexers
             )
         self.i = self.indices
+        # (frame, outputKey) -> (rows on disk, saved indexer columns):
+        self._diskIndexCache = dict()
+        self._jointIndices = dict()
         super().__init__(**kwargs)
 
     @property
@@ -120,11 +199,99 @@ class Indexer(Producer):
             )))
         return outs
 
+    def _disk_indices(self):
+        # The saved indexer columns, re-read only if the frame has changed
+        # other than through this producer's own saves.
+        readouts = self.readouts
+        cacheKey = (readouts.h5filename, self.outputKey)
+        ks = self.indexerKeys
+        with disk.H5Wrap(readouts):
+            length = readouts.shape(ks[0])[0]
+            try:
+                cachedLength, columns = self._diskIndexCache[cacheKey]
+                if cachedLength == length:
+                    return columns
+            except KeyError:
+                pass
+            columns = OrderedDict(
+                (k, np.asarray(readouts[k])) for k in ks
+                )
+        self._diskIndexCache[cacheKey] = (length, columns)
+        return columns
+    def _extend_disk_indices(self, stored):
+        cacheKey = (self.readouts.h5filename, self.outputKey)
+        try:
+            length, columns = self._diskIndexCache[cacheKey]
+        except KeyError:
+            return
+        columns = OrderedDict(
+            (k, np.concatenate([v, stored[k]])) for k, v in columns.items()
+            )
+        self._diskIndexCache[cacheKey] = \
+            (length + len(stored[self.indexerKeys[0]]), columns)
+    @property
+    def jointIndex(self):
+        '''
+        A JointIndex over the saved rows of the current output subkey.
+        '''
+        columns = self._disk_indices()
+        cacheKey = (self.readouts.h5filename, self.outputKey)
+        try:
+            joint = self._jointIndices[cacheKey]
+            if joint.columns.keys() == columns.keys() and all(
+                    joint.columns[k] is v for k, v in columns.items()
+                    ):
+                return joint
+        except KeyError:
+            pass
+        joint = JointIndex(columns)
+        self._jointIndices[cacheKey] = joint
+        return joint
+    def rows_within(self, ik, lo = None, hi = None):
+        '''
+        Returns the saved rows at which indexer 'ik' lies in [lo, hi].
+        '''
+        return self.jointIndex.within(ik, lo, hi)
+    def _latest(self, ik, bound, by):
+        # The greatest value of 'by' over rows in memory or on disk
+        # at which 'ik' is at most 'bound'.
+        candidates = []
+        for outs in [self.outs, *self.inflightOuts]:
+            columns = OrderedDict(
+                (k, outs.stored[k].view) for k in (ik, by)
+                )
+            try:
+                row = JointIndex(columns).latest(ik, bound, by)
+            except ValueError:
+                continue
+            candidates.append(columns[by][row])
+        try:
+            joint = self.jointIndex
+            candidates.append(
+                joint.columns[by][joint.latest(ik, bound, by)]
+                )
+        except (ValueError, NoActiveAnchorError, PathNotInFrameError):
+            pass
+        if not candidates:
+            raise ValueError(bound)
+        return max(candidates).item()
+    def load_latest(self, ik, bound, by = 'count'):
+        '''
+        Loads the row with the greatest indexer 'by' \
+        at which indexer 'ik' is at most 'bound', \
+        e.g. the latest count reached by a given time.
+        '''
+        try:
+            value = self._latest(ik, bound, by)
+        except ValueError:
+            raise IndexerLoadFail
+        self.load(value)
+        return value
     @property
     def indicesDisk(self):
         diskIndices = OrderedDict()
-        for k in self.indexerKeys:
-            diskIndices[k] = list(self.readouts[k])
+        for k, v in self._disk_indices().items():
+            diskIndices[k] = list(v)
         return diskIndices
     @property
     def indicesStored(self):
@@ -157,20 +324,82 @@ class Indexer(Producer):
         else:
             return combinedIndices
     def _indexer_drop_clashes(self):
-        _, clashes = self._indices_all(clashes = True)
-        clashes = zip(*clashes.values())
-        stored = zip(*[self.outs.stored[k] for k in self.indexerKeys])
-        toDrop = []
-        # print(list(clashes))
-        # print(list(stored))
-        for i, row in enumerate(stored):
-            if any(all(r == c for r, c in zip(row, crow)) for crow in clashes):
-                toDrop.append(i)
-        self.outs.drop(toDrop)
+        # Drops stored rows whose indices are already on disk.
+        if not len(self.outs):
+            return
+        try:
+            diskColumns = list(self._disk_indices().values())
+        except (NoActiveAnchorError, PathNotInFrameError):
+            return
+        storedColumns = [self.outs.stored[k].view for k in self.indexerKeys]
+        clashes = np.isin(
+            _as_records(storedColumns, diskColumns),
+            _as_records(diskColumns, storedColumns),
+            )
+        self.outs.drop(np.flatnonzero(clashes))
 
     def _save(self):
         self._indexer_drop_clashes()
+        stored = dict(self.outs.zipstacked)
         super()._save()
+        self._extend_disk_indices(stored)
+        for k in self.indexerKeys:
+            self.writeouts.reindex(k)
+    def _retain(self):
+        super()._retain()
+        if not self.retention is None:
+            self._diskIndexCache.pop(
+                (self.readouts.h5filename, self.outputKey), None
+                )
+            for k in self.indexerKeys:
+                self.writeouts.reindex(k)
+    def _index_disk(self, ik, arg):
+        try:
+            return self.readouts.search_index(ik, arg)
+        except PathNotInFrameError:
+            # frames saved before indices were kept
+            return self.indicesDisk[ik].index(arg)
+
+    def _nearest_index(self, ik, arg):
+        # The greatest value of indexer 'ik' at or below 'arg'
+        # held in memory or on disk; raises ValueError if there is none.
+        candidates = []
+        for outs in [self.outs, *self.inflightOuts]:
+            column = outs.stored[ik].view
+            column = column[column <= arg]
+            if len(column):
+                candidates.append(column.max())
+        try:
+            candidates.append(self.readouts.floor_index(ik, arg)[0])
+        except PathNotInFrameError:
+            # frames saved before indices were kept
+            try:
+                column = np.asarray(self.indicesDisk[ik])
+                column = column[column <= arg]
+                if len(column):
+                    candidates.append(column.max())
+            except (NoActiveAnchorError, PathNotInFrameError):
+                pass
+        except (ValueError, NoActiveAnchorError):
+            pass
+        if not candidates:
+            raise ValueError(arg)
+        return max(candidates).item()
+    def load_nearest(self, arg):
+        '''
+        Loads the stored index nearest to 'arg' without passing it, \
+        returning the index loaded.
+        '''
+        if isinstance(arg, Comparator) and hasattr(arg, 'index'):
+            arg = arg.index
+        arg = self._process_index(arg)
+        i, ik, it = self._get_indexInfo(arg)
+        try:
+            nearest = self._nearest_index(ik, arg)
+        except ValueError:
+            raise IndexerLoadFail
+        self.load(nearest)
+        return nearest
 
     def _load_process(self, outs):
         vals = [outs.pop(k) for k in self.indexerKeys]
@@ -192,8 +421,14 @@ class Indexer(Producer):
         try:
             ind = self.outs.index(**{ik: arg})
         except ValueError:
+            for outs in self.inflightOuts:
+                try:
+                    ind = outs.index(**{ik: arg})
+                except ValueError:
+                    continue
+                return self._load_index_stored(ind, outs)
             try:
-                ind = self.indicesDisk[ik].index(arg)
+                ind = self._index_disk(ik, arg)
             except (ValueError, NoActiveAnchorError, PathNotInFrameError):
                 raise IndexerLoadFail
             return self._load_index_disk(ind)
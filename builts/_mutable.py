@@ -22,6 +22,7 @@ class MutantMissingMethod(EverestException):
     pass
 
 class Mutant(Pyklet):
+    _cacheHash = False # the hash follows the variable
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
     def _hashID(self):
@@ -1,3 +1,6 @@
+import os
+import tempfile
+import weakref
 import numpy as np
 from functools import wraps
 from collections.abc import Mapping
@@ -5,10 +8,10 @@ from collections import OrderedDict
 import warnings
 
 from .. import disk
+from .. import mpi
 from ..reader import Reader
 from ..writer import Writer
 
-# from . import buffersize_exceeded
 from ._promptable import Promptable
 from ..array import EverestArray
 from .. import exceptions
@@ -39,7 +42,7 @@ from collections import OrderedDict
 import numpy as np
 import math
 
-from everest.utilities import make_hash
+from everest.hashing import content_hash
 from everest.builts._producer import ProducerException
 
 class OutsException(ProducerException):
@@ -53,14 +56,145 @@ class NullValueDetected(OutsException):
 class OutsNull:
     pass
 
+class OutsColumn:
+    '''
+    A growable, preallocated array holding the stored values of one \
+    out key. Appends are amortised O(1) (capacity doubles as needed), \
+    the dtype is promoted if a new value requires it, \
+    and 'view' gives the filled rows without copying.
+    '''
+    def __init__(self, capacity = 16):
+        self._initCapacity = capacity
+        self._buffer = None
+        self._len = 0
+    def append(self, val):
+        val = np.asarray(val)
+        if self._buffer is None:
+            self._buffer = self._allocate(
+                (self._initCapacity, *val.shape),
+                val.dtype
+                )
+        elif not val.shape == self._buffer.shape[1:]:
+            raise ValueError(
+                "Cannot store a value of shape " + str(val.shape) \
+                + " alongside values of shape " \
+                + str(self._buffer.shape[1:])
+                )
+        else:
+            dtype = np.result_type(self._buffer.dtype, val.dtype)
+            if self._len == len(self._buffer):
+                self._resize(2 * len(self._buffer), dtype)
+            elif not dtype == self._buffer.dtype:
+                self._resize(len(self._buffer), dtype)
+        self._buffer[self._len] = val
+        self._len += 1
+    def _allocate(self, shape, dtype):
+        return np.empty(shape, dtype = dtype)
+    def _resize(self, capacity, dtype = None):
+        if dtype is None:
+            dtype = self._buffer.dtype
+        newBuffer = self._allocate((capacity, *self._buffer.shape[1:]), dtype)
+        newBuffer[:self._len] = self._buffer[:self._len]
+        self._buffer = newBuffer
+    @property
+    def view(self):
+        if self._buffer is None:
+            return np.empty(0)
+        return self._buffer[:self._len]
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.view[index]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError(index)
+        out = self._buffer[index]
+        if isinstance(out, np.ndarray):
+            out = np.array(out)
+        return out
+    def __iter__(self):
+        for index in range(self._len):
+            yield self[index]
+    def __len__(self):
+        return self._len
+    def pop(self, index):
+        out = self[index]
+        self.drop([index % self._len])
+        return out
+    def drop(self, indices):
+        if not len(indices):
+            return
+        # only the rows after the first dropped need to move:
+        indices = np.asarray(list(indices))
+        start = indices.min()
+        keep = np.ones(self._len - start, dtype = bool)
+        keep[indices - start] = False
+        kept = self._buffer[start : self._len][keep]
+        self._len = start + len(kept)
+        self._buffer[start : self._len] = kept
+    def reorder(self, indices):
+        self._buffer[:self._len] = self.view[indices]
+    def clear(self):
+        self._buffer = None
+        self._len = 0
+    @property
+    def nbytes(self):
+        if self._buffer is None:
+            return 0
+        return self._len * self._buffer[:1].nbytes
+    @property
+    def ramnbytes(self):
+        # of nbytes, those held in RAM rather than in a scratch file
+        return self.nbytes
+
+class MappedOutsColumn(OutsColumn):
+    '''
+    An OutsColumn kept in a memory-mapped scratch file under 'path' \
+    instead of in RAM, so that only recently touched rows stay resident. \
+    The file is unlinked as soon as it is mapped (where the platform \
+    allows), so nothing is left behind in the scratch directory.
+    '''
+    def __init__(self, path, capacity = 16):
+        self.path = path
+        super().__init__(capacity)
+    def _allocate(self, shape, dtype):
+        os.makedirs(self.path, exist_ok = True)
+        fd, filename = tempfile.mkstemp(dir = self.path, suffix = '.outs')
+        os.close(fd)
+        if not int(np.prod(shape)) * np.dtype(dtype).itemsize:
+            os.remove(filename)
+            return super()._allocate(shape, dtype)
+        buffer = np.memmap(filename, dtype = dtype, mode = 'w+', shape = shape)
+        try:
+            os.remove(filename)
+        except OSError:
+            weakref.finalize(buffer, os.remove, filename)
+        return buffer
+    @property
+    def ramnbytes(self):
+        if isinstance(self._buffer, np.memmap):
+            return 0
+        return self.nbytes
+
+def _default_scratch():
+    return os.environ.get('EVEREST_SCRATCH', '') \
+        or os.path.join(tempfile.gettempdir(), 'everest-scratch')
+
 class Outs:
-    def __init__(self, keys, name = 'default'):
+    # bytes accounted per stored row for its content hash:
+    _hashnbytes = np.dtype('U32').itemsize
+    def __init__(self, keys, name = 'default', scratch = None):
         self._keys, self.name = keys, name
         self._data = OrderedDict([(k, OutsNull) for k in self._keys])
         self._collateral = OrderedDict()
         self._data.name = name
-        self.stored = OrderedDict([(k, []) for k in self._keys])
+        # a directory to keep stored rows in, or None to keep them in RAM:
+        self.scratch = scratch
+        self.stored = OrderedDict([(k, self._new_column()) for k in self._keys])
         self.hashVals = []
+        self._hashSet = set()
+        # key -> {value: first row holding it}, built on first lookup:
+        self._rowIndices = dict()
         self.token = None
     @property
     def data(self):
@@ -88,8 +222,8 @@ class Outs:
     def __delitem__(self, k):
         raise OutsKeysImmutable
     def store(self, silent = False):
-        hashVal = make_hash(self._data.values())
-        if hashVal in self.hashVals:
+        hashVal = content_hash(self._data.values())
+        if hashVal in self._hashSet:
             if not silent:
                 warnings.warn(
                     "This data was already saved - did you expect this?"
@@ -101,48 +235,115 @@ class Outs:
                 else:
                     raise NullValueDetected
             else:
+                row = len(self)
                 for k, v in self._data.items():
                     self.stored[k].append(v)
                 self.hashVals.append(hashVal)
+                self._hashSet.add(hashVal)
+                for k, rowIndex in self._rowIndices.items():
+                    rowIndex.setdefault(self.stored[k][row], row)
     def sort(self, key = None):
         if key is None:
             key = self._keys[0]
-        sortInds = np.stack(self.stored[key]).argsort()
-        for k, v in self.zipstacked:
-            self.stored[k][:] = v[sortInds]
+        sortInds = self.stored[key].view.argsort(kind = 'stable')
+        for v in self.stored.values():
+            v.reorder(sortInds)
+        self.hashVals[:] = [self.hashVals[i] for i in sortInds]
+        self._rowIndices.clear()
     def clear(self, silent = False):
         if not silent:
             if not len(self.hashVals):
                 warnings.warn("No data was cleared - did you expect this?")
         self.hashVals.clear()
-        for k, v in self.stored.items():
-            v.clear()
+        self._hashSet.clear()
+        self._rowIndices.clear()
+        self.stored = OrderedDict([(k, self._new_column()) for k in self._keys])
     def retrieve(self, index):
         for v in self.stored.values():
             yield v[index]
     def pop(self, index):
-        _ = self.hashVals.pop(index)
+        index = range(len(self))[index]
+        self._drop_rows([index])
+        self._hashSet.discard(self.hashVals.pop(index))
         for v in self.stored.values():
             yield v.pop(index)
     def drop(self, indices):
-        keep = [i for i in range(len(self)) if not i in indices]
-        self.hashVals[:] = [self.hashVals[i] for i in keep]
+        indices = sorted(set(indices))
+        if not len(indices):
+            return
+        self._drop_rows(indices)
+        start, dropped = indices[0], set(indices)
+        for i in indices:
+            self._hashSet.discard(self.hashVals[i])
+        self.hashVals[start:] = [
+            h for i, h in enumerate(self.hashVals[start:], start) \
+                if not i in dropped
+            ]
         for v in self.stored.values():
-            v[:] = [v[i] for i in keep]
+            v.drop(indices)
+    def _drop_rows(self, indices):
+        # Updates the row indices for the removal of the given
+        # (sorted) rows. Only rows from the first removed on move,
+        # so only values first held by one of those are re-indexed.
+        start, dropped = indices[0], set(indices)
+        for k, rowIndex in self._rowIndices.items():
+            tail = self.stored[k].view[start:]
+            for val in tail:
+                if rowIndex.get(val, -1) >= start:
+                    del rowIndex[val]
+            shift = 0
+            for row, val in enumerate(tail, start):
+                if row in dropped:
+                    shift += 1
+                else:
+                    rowIndex.setdefault(val, row - shift)
+    def _row_index(self, k):
+        try:
+            return self._rowIndices[k]
+        except KeyError:
+            rowIndex = dict()
+            try:
+                for row, val in enumerate(self.stored[k]):
+                    rowIndex.setdefault(val, row)
+            except TypeError:
+                return None
+            self._rowIndices[k] = rowIndex
+            return rowIndex
+    def _search(self, k, v):
+        rowIndex = self._row_index(k)
+        if rowIndex is None:
+            return list(self.stored[k]).index(v)
+        try:
+            return rowIndex[v]
+        except (KeyError, TypeError):
+            raise ValueError(v)
     def index(self, **kwargs):
-        search = lambda k, v: self.stored[k].index(v)
-        indices = [search(k, v) for k, v in sorted(kwargs.items())]
+        indices = [self._search(k, v) for k, v in sorted(kwargs.items())]
         if len(set(indices)) != 1:
             raise ValueError
         return indices[0]
     def keys(self):
         return self._data.keys()
+    def _new_column(self):
+        if self.scratch is None:
+            return OutsColumn()
+        return MappedOutsColumn(self.scratch)
+    def renew(self):
+        '''
+        Returns an empty Outs with the same keys, current data, \
+        collateral and token, to take over from this one.
+        '''
+        new = type(self)(self._keys, self.name, self.scratch)
+        new.update(self._data, silent = True)
+        new._collateral = self._collateral
+        new.token = self.token
+        return new
     @property
     def stacked(self):
         if len(self):
             for v in self.stored.values():
                 assert len(v)
-                yield np.stack(v)
+                yield v.view
         else:
             for v in self.stored:
                 yield []
@@ -151,9 +352,15 @@ class Outs:
         return zip(self._keys, self.stacked)
     @property
     def nbytes(self):
-        nbytes = np.array(self.hashVals).nbytes
+        nbytes = len(self) * self._hashnbytes
         for v in self.stored.values():
-            nbytes += np.array(v).nbytes
+            nbytes += v.nbytes
+        return nbytes
+    @property
+    def ramnbytes(self):
+        nbytes = len(self) * self._hashnbytes
+        for v in self.stored.values():
+            nbytes += v.ramnbytes
         return nbytes
     @property
     def strnbytes(self):
@@ -178,6 +385,19 @@ def _producer_update_outs(func):
         return toReturn
     return wrapper
 
+BACKGROUNDSAVE = False
+def set_background_save(active = True):
+    '''
+    If active, Producer.save hands full buffers to a background writer \
+    and returns at once; see disk.wait_writes for durability. \
+    This shortens the time save blocks, not the total: the next access \
+    to the frame, including the next save, first waits for the writes, \
+    and saves made inside an open session are written at once. \
+    Ignored when running under MPI.
+    '''
+    global BACKGROUNDSAVE
+    BACKGROUNDSAVE = active
+
 class Producer(Promptable):
 
     _defaultOutputSubKey = 'default'
@@ -192,6 +412,11 @@ class Producer(Promptable):
             self.baselines[key] = EverestArray(val, extendable = False)
 
         self._outs = OrderedDict()
+        self._scratch = None
+        self.storagePolicies = []
+        self.retention = None
+        # (future, outs) for buffers still being written in the background:
+        self._inflight = []
         self._randomstate = None
 
         super().__init__(baselines = self.baselines, **kwargs)
@@ -235,7 +460,7 @@ class Producer(Promptable):
                 outs.token = self.randomstate
         else:
             outsDict = self.out()
-            outs = Outs(outsDict.keys(), sk)
+            outs = Outs(outsDict.keys(), sk, self._scratch)
             self._outs[sk] = outs
             try:
                 outs.update(outsDict)
@@ -247,14 +472,50 @@ class Producer(Promptable):
     def out(self):
         return self._out()
 
+    def spill(self, active = True, path = None):
+        '''
+        If active, keeps this producer's stored outputs in memory-mapped \
+        scratch files under 'path' (by default $EVEREST_SCRATCH, \
+        or a directory in the system temporary directory) rather than \
+        in RAM; saving then streams them from there into the frame. \
+        Buffers already holding rows are switched once they are cleared.
+        '''
+        if not active:
+            self._scratch = None
+        elif path is None:
+            self._scratch = _default_scratch()
+        else:
+            self._scratch = os.path.abspath(path)
+        for outs in self._outs.values():
+            outs.scratch = self._scratch
+            if not len(outs):
+                outs.clear(silent = True)
+    def set_policies(self, *policies, retention = None):
+        '''
+        Sets the storage policies (see everest.policies) that must all \
+        agree for store() to keep a row, and the Retention, if any, \
+        applied to saved rows whenever the producer saves.
+        '''
+        self.storagePolicies = list(policies)
+        self.retention = retention
     def store(self, silent = False):
+        for policy in self.storagePolicies:
+            if not policy(self):
+                return
         self.outs.store(silent = silent)
+        type(self)._governor.update(self)
+        type(self)._governor.check()
     def clear(self, silent = False):
         self.outs.clear(silent = silent)
+        type(self)._governor.update(self)
     @property
     def nbytes(self):
         return sum([o.nbytes for o in self._outs.values()])
     @property
+    def ramnbytes(self):
+        # of nbytes, those held in RAM rather than spilled to scratch
+        return sum([o.ramnbytes for o in self._outs.values()])
+    @property
     def strnbytes(self):
         return prettify_nbytes(self.nbytes)
 
@@ -268,14 +529,68 @@ class Producer(Promptable):
     def writeouts(self):
         return self.writer.sub(self.outputKey)
 
+    def save(self, silent = False, wait = False, background = None):
+        if background is None:
+            background = BACKGROUNDSAVE
+        if background and mpi.size == 1:
+            self._save_background(silent)
+        else:
+            self._save_foreground(silent)
+        if wait:
+            disk.wait_writes()
+    def _retain(self):
+        if not self.retention is None:
+            self.writeouts.retain(
+                self.retention,
+                self.retention.key,
+                list(self.outs.keys()),
+                )
     @disk.h5filewrap
-    def save(self, silent = False):
+    def _save_foreground(self, silent = False):
         try:
             self._save()
+            self._retain()
         except ProducerNothingToSave:
             if not silent:
                 warnings.warn("No data was saved - did you expect this?")
         self.outs.clear(silent = silent)
+        type(self)._governor.update(self)
+    def _save_background(self, silent = False):
+        # Everything up to the writes themselves happens here;
+        # the full buffer is then swapped out for a fresh one
+        # and left to the background writer.
+        outs = self.outs
+        deferred = self._save_deferred(silent)
+        if len(deferred.jobs):
+            # outside the session, else the writes could not start:
+            future = disk.submit_writes(deferred)
+            self._inflight = [
+                (f, o) for f, o in self._inflight if not f.done()
+                ]
+            self._inflight.append((future, outs))
+        if len(outs):
+            self._outs[outs.name] = outs.renew()
+        else:
+            outs.clear(silent = silent)
+        type(self)._governor.update(self)
+    @disk.h5filewrap
+    def _save_deferred(self, silent = False):
+        deferred = disk.DeferredWrites()
+        try:
+            with deferred:
+                self._save()
+                self._retain()
+        except ProducerNothingToSave:
+            if not silent:
+                warnings.warn("No data was saved - did you expect this?")
+        return deferred
+    @property
+    def inflightOuts(self):
+        self._inflight = [(f, o) for f, o in self._inflight if not f.done()]
+        return [
+            o for f, o in reversed(self._inflight) \
+                if o.name == self.outputSubKey
+            ]
     def _save(self):
         if not len(self.outs):
             raise ProducerNothingToSave
@@ -299,12 +614,70 @@ class Producer(Promptable):
                 )
         return {**outs}
     @_producer_load_wrapper
-    def _load_index_stored(self, index):
-        return dict(zip(self.outs.keys(), self.outs.retrieve(index)))
+    def _load_index_stored(self, index, outs = None):
+        if outs is None:
+            outs = self.outs
+        return dict(zip(outs.keys(), outs.retrieve(index)))
+    def iter_outputs(self,
+            keys = None,
+            chunk = 1024,
+            start = None,
+            stop = None,
+            structured = False,
+            ):
+        '''
+        Iterates over the saved outputs under outputKey in batches of \
+        up to 'chunk' rows, reading aligned slices of each key's dataset \
+        so that histories of any length are walked in constant memory. \
+        Yields dicts of arrays by key, or record arrays if 'structured'. \
+        The frame is held open until the iterator is exhausted or closed.
+        '''
+        readouts = self.readouts
+        if keys is None:
+            keys = list(self.outs.keys())
+        elif type(keys) is str:
+            keys = [keys]
+        with disk.H5Wrap(readouts):
+            lengths = set(readouts.shape(k)[0] for k in keys)
+        if not len(lengths) == 1:
+            raise ProducerLoadFail("Output datasets are misaligned.")
+        start, stop, _ = slice(start, stop).indices(lengths.pop())
+        return self._iter_outputs(
+            readouts, keys, chunk, start, stop, structured
+            )
+    @staticmethod
+    def _iter_outputs(readouts, keys, chunk, start, stop, structured):
+        # One session for the whole walk, held between batches
+        # and released once the iterator is exhausted or closed:
+        with disk.H5Wrap(readouts):
+            for i in range(start, stop, chunk):
+                indices = slice(i, min(i + chunk, stop))
+                batch = OrderedDict(
+                    (k, np.asarray(readouts._getstr(k, _indices = indices))) \
+                        for k in keys
+                    )
+                if structured:
+                    records = np.empty(
+                        indices.stop - indices.start,
+                        dtype = [
+                            (k, v.dtype, v.shape[1:]) for k, v in batch.items()
+                            ]
+                        )
+                    for k, v in batch.items():
+                        records[k] = v
+                    yield records
+                else:
+                    yield batch
+
     @_producer_load_wrapper
     def _load_index_disk(self, index):
-        ks = self.outs.keys()
-        return dict(zip(ks, (self.readouts[k][index] for k in ks)))
+        # Reads only the row wanted from each dataset:
+        readouts, rows = self.readouts, slice(index, index + 1)
+        with disk.H5Wrap(readouts):
+            return {
+                k: readouts._getstr(k, _indices = rows)[0] \
+                    for k in self.outs.keys()
+                }
     def _load_index(self, index):
         try:
             return self._load_index_stored(index)
@@ -1,4 +1,8 @@
 from functools import wraps
+from contextlib import contextmanager
+import operator
+
+import numpy as np
 
 from ._counter import Counter
 from ._cycler import Cycler
@@ -36,6 +40,10 @@ def _voyager_initialise_if_necessary(post = False):
 def _voyager_changed_state(func):
     @wraps(func)
     def wrapper(self, *args, **kwargs):
+        if self._voyagerBatch:
+            # the hook is deferred to the end of the batch:
+            self._voyagerBatch[0] = True
+            return func(self, *args, **kwargs)
         pc = [i.value for i in self.indices]
         out = func(self, *args, **kwargs)
         nc = [i.value for i in self.indices]
@@ -51,6 +59,9 @@ class Voyager(Cycler, Counter, Stampable):
             ):
 
         self.baselines = dict()
+        # while iterating in a batch, a list holding
+        # whether the state has changed since the hook last fired:
+        self._voyagerBatch = None
 
         super().__init__(**kwargs)
 
@@ -77,14 +88,40 @@ class Voyager(Cycler, Counter, Stampable):
     @_producer_update_outs
     def _voyager_changed_state_hook(self):
         pass
+    @contextmanager
+    def _voyager_batch(self):
+        # Defers the state-change hook until the batch ends,
+        # or until the outputs are asked for, e.g. to store them.
+        if self._voyagerBatch:
+            yield
+            return
+        self._voyagerBatch = [False]
+        try:
+            yield
+        finally:
+            changed = self._voyagerBatch[0]
+            self._voyagerBatch = None
+            if changed:
+                self._voyager_changed_state_hook()
+    @property
+    def outs(self):
+        if self._voyagerBatch and self._voyagerBatch[0]:
+            self._voyagerBatch[0] = False
+            self._voyager_changed_state_hook()
+        return super().outs
 
     @_voyager_initialise_if_necessary(post = True)
     def iterate(self, n = 1, silent = True):
-        for i in range(n):
+        if n == 1:
             self._iterate()
+            return
+        iterate = self._iterate
+        with self._voyager_batch():
+            for i in range(n):
+                iterate()
     @_voyager_changed_state
     def _iterate(self):
-        self.indices.count.value += 1
+        self.indices.count.increment()
 
     @_voyager_initialise_if_necessary(post = True)
     def go(self, stop):
@@ -98,6 +135,9 @@ class Voyager(Cycler, Counter, Stampable):
                 stop = self._indexer_process_endpoint(stop, close = False)
             if self._indexers_isnull:
                 self.initialise()
+            if hasattr(stop, 'index'):
+                self._go_nearest(stop)
+                return None
             slots = stop.slots
             if slots == 1:
                 boolean = stop.close(self)
@@ -109,9 +149,54 @@ class Voyager(Cycler, Counter, Stampable):
             if boolean:
                 raise Exception("Condition already met.")
             self._go(boolean)
+    def _go_nearest(self, stop):
+        # Starts from the nearest stored index at or below the target,
+        # or from here if that is nearer, then iterates forward.
+        target = self._process_index(stop.index)
+        i, ik, it = self._get_indexInfo(target)
+        current = i.value
+        try:
+            nearest = self._nearest_index(ik, target)
+        except ValueError:
+            nearest = None
+        if current > target or (not nearest is None and nearest > current):
+            if nearest is None:
+                self.reset()
+            else:
+                self.load(nearest)
+        self._go(stop.close(self))
     def _go(self, stop = False):
-        while not stop:
-            self.iterate()
+        steps = self._count_steps(stop)
+        if not steps is None:
+            self.iterate(steps)
+        if isinstance(stop, Comparator):
+            check = stop.compile()
+        else:
+            check = lambda: bool(stop)
+        # go() has already initialised, so step directly:
+        iterate = self._iterate
+        with self._voyager_batch():
+            while not check():
+                iterate()
+    def _count_steps(self, stop):
+        # For a closed comparator that only awaits a count,
+        # the number of steps that should meet it; otherwise None.
+        if not isinstance(stop, Comparator) or stop.slots:
+            return None
+        if stop.invert or stop.asList or not len(stop.terms) == 2:
+            return None
+        term, target = stop.terms
+        if type(term) is Prop and term.target is self:
+            term = term()
+        if not term is self.indices.count or term.null:
+            return None
+        if not type(target) is int and not isinstance(target, np.integer):
+            return None
+        try:
+            offset = {operator.ge: 0, operator.eq: 0, operator.gt: 1}[stop.op]
+        except (KeyError, TypeError):
+            return None
+        return max(0, int(target) + offset - term.plain)
 
     def _cycle(self):
         super()._cycle()
@@ -0,0 +1,96 @@
+import numpy as np
+
+from .. import disk
+from ._voyager import Voyager
+
+from . import BuiltException, MissingMethod, touch_builts
+class EnsembleException(BuiltException):
+    pass
+class EnsembleMissingMethod(MissingMethod, EnsembleException):
+    pass
+class EnsembleMismatch(EnsembleException):
+    pass
+
+class Ensemble:
+    '''
+    Advances many Voyagers of one class in lockstep. \
+    The class provides three classmethods: \
+    '_vector_stack(members)', returning a dict of arrays \
+    holding the members' state and parameters; \
+    '_vector_iterate(state, counts)', advancing every member one step \
+    in place, given their counts before the step; \
+    and '_vector_unstack(members, state)', writing the state back. \
+    Each member keeps its own count, outputs and stored rows; \
+    since only the count is advanced, members may have no other indexer. \
+    Saving is not batched: each member writes its own datasets in turn, \
+    sharing only the file session and one transaction for their records.
+    '''
+
+    _vectorMethods = ('_vector_stack', '_vector_iterate', '_vector_unstack')
+
+    def __init__(self, members):
+        self.members = list(members)
+        if not len(self.members):
+            raise EnsembleException("An ensemble needs members.")
+        cls = type(self.members[0])
+        if not issubclass(cls, Voyager):
+            raise EnsembleMismatch("Members must be Voyagers.", cls)
+        if not all(type(m) is cls for m in self.members):
+            raise EnsembleMismatch("Members must share one class.", cls)
+        if len(set(map(id, self.members))) < len(self.members):
+            raise EnsembleMismatch("Members must be distinct.")
+        for name in self._vectorMethods:
+            if not hasattr(cls, name):
+                raise EnsembleMissingMethod(name)
+        if not self.members[0].indexerKeys == ['count']:
+            raise EnsembleMismatch(
+                "Members may be indexed by count alone.",
+                self.members[0].indexerKeys
+                )
+        self.cls = cls
+
+    def __len__(self):
+        return len(self.members)
+    def __iter__(self):
+        return iter(self.members)
+    def __getitem__(self, index):
+        return self.members[index]
+
+    @property
+    def counts(self):
+        return np.array([m.indices.count.plain for m in self.members])
+
+    def initialise(self):
+        for m in self.members:
+            if not (m.initialised or m.postinitialised):
+                m.initialise()
+    def reset(self):
+        for m in self.members:
+            m.reset()
+
+    def iterate(self, n = 1):
+        self.initialise()
+        counts = self.counts
+        state = self.cls._vector_stack(self.members)
+        vector_iterate = self.cls._vector_iterate
+        for i in range(n):
+            vector_iterate(state, counts)
+            counts += 1
+        self.cls._vector_unstack(self.members, state)
+        for m in self.members:
+            m.indices.count.increment(n)
+            m._voyager_changed_state_hook()
+
+    def store(self, silent = False):
+        for m in self.members:
+            m.store(silent = silent)
+    def clear(self, silent = False):
+        for m in self.members:
+            m.clear(silent = silent)
+    def save(self, silent = False):
+        # One write per member, as when saved alone,
+        # but within one file session and after one touch of them all:
+        with disk.H5Wrap(self.members[0].writer):
+            touch_builts(self.members)
+            for m in self.members:
+                m.save(silent = silent)
@@ -13,23 +13,47 @@ class PiMachine(Voyager):
             **kwargs
             ):
         self.state = 0.
-        self._outkeys = ['pi,']
         super().__init__(**kwargs)
     def kth(self, k):
         s, b, A = self.inputs['s'], self.inputs['b'], self.inputs['A']
-        val = 1. / b **k * sum([
+        val = float(b) ** -k * sum([
             a / (len(A) * k + (j + 1))**s \
                 for j, a in enumerate(A)
             ])
         return val
     def _out(self):
-        yield np.array(self.state)
+        outs = super()._out()
+        outs['pi'] = np.array(self.state)
+        return outs
     def _initialise(self):
         self.state = self.kth(0)
+        super()._initialise()
     def _iterate(self):
-        kthVal = self.kth(self.count.value)
-        self.state += kthVal
-    def _load_process(self, loadDict):
-        self.state = loadDict['pi']
+        self.state += self.kth(self.indices.count.value + 1)
+        super()._iterate()
+    @classmethod
+    def _vector_stack(cls, members):
+        inputs = [m.inputs for m in members]
+        return dict(
+            state = np.array([m.state for m in members], dtype = float),
+            s = np.array([i['s'] for i in inputs])[:, None],
+            b = np.array([i['b'] for i in inputs], dtype = float),
+            A = np.array([i['A'] for i in inputs], dtype = float),
+            )
+    @classmethod
+    def _vector_iterate(cls, state, counts):
+        k = counts + 1
+        A = state['A']
+        j = np.arange(1, A.shape[1] + 1)
+        terms = A / (A.shape[1] * k[:, None] + j) ** state['s']
+        state['state'] += state['b'] ** -k * terms.sum(axis = 1)
+    @classmethod
+    def _vector_unstack(cls, members, state):
+        for m, val in zip(members, state['state']):
+            m.state = float(val)
+    def _load_process(self, outs):
+        outs = super()._load_process(outs)
+        self.state = float(outs.pop('pi'))
+        return outs
 
 CLASS = PiMachine
@@ -0,0 +1,167 @@
+import os
+import pickle
+import hashlib
+import tempfile
+from collections import OrderedDict
+
+from .exceptions import EverestException
+class CacheException(EverestException):
+    pass
+class CacheMiss(CacheException, KeyError):
+    pass
+
+def _default_cachedir():
+    try:
+        return os.environ['EVEREST_CACHE']
+    except KeyError:
+        try:
+            base = os.environ['XDG_CACHE_HOME']
+        except KeyError:
+            base = os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(base, 'everest')
+
+CACHEDIR = _default_cachedir()
+CACHEACTIVE = not os.environ.get('EVEREST_NOCACHE', '')
+
+def digest(content):
+    if type(content) is str:
+        content = content.encode()
+    return hashlib.blake2b(content, digest_size = 16).hexdigest()
+
+class DiskCache:
+    '''
+    A persistent key-value store shared by all processes on a machine. \
+    Each entry lives in its own small pickle file under the cache \
+    directory and is written atomically, so concurrent writers are safe \
+    and no locking is required. Keys must have a stable repr. \
+    Lookups are memoised in-process.
+    '''
+    def __init__(self, name, path = None):
+        if path is None:
+            path = CACHEDIR
+        self.name = name
+        self.path = os.path.join(os.path.abspath(path), name)
+        self._memo = dict()
+    def _filename(self, key):
+        keyDigest = digest(repr(key))
+        return os.path.join(self.path, keyDigest[:2], keyDigest + '.pkl')
+    def __getitem__(self, key):
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        if not CACHEACTIVE:
+            raise CacheMiss(key)
+        try:
+            with open(self._filename(key), 'rb') as file:
+                storedKey, val = pickle.load(file)
+        except Exception:
+            raise CacheMiss(key)
+        if storedKey != key:
+            raise CacheMiss(key)
+        self._memo[key] = val
+        return val
+    def __setitem__(self, key, val):
+        self._memo[key] = val
+        if not CACHEACTIVE:
+            return
+        filename = self._filename(key)
+        dirname = os.path.dirname(filename)
+        try:
+            os.makedirs(dirname, exist_ok = True)
+            fd, tempname = tempfile.mkstemp(dir = dirname, suffix = '.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as file:
+                    pickle.dump((key, val), file)
+                os.replace(tempname, filename)
+            except BaseException:
+                os.remove(tempname)
+                raise
+        except (OSError, pickle.PicklingError, AttributeError, TypeError):
+            # Unwritable cache or unpicklable value: memo only.
+            pass
+    def __contains__(self, key):
+        try:
+            self[key]
+            return True
+        except CacheMiss:
+            return False
+    def get(self, key, default = None):
+        try:
+            return self[key]
+        except CacheMiss:
+            return default
+    def clear_memo(self):
+        self._memo.clear()
+
+class LRUCache:
+    '''
+    Holds strong references to recently used objects, \
+    discarding the least recently used first once there are more than \
+    'maxsize' entries or their 'sizeof' totals more than 'maxbytes' \
+    (either bound may be None). Sizes are re-measured whenever an entry \
+    is used, so objects that grow are accounted for.
+    '''
+    def __init__(self, maxsize = 128, maxbytes = None, sizeof = None):
+        self.maxsize, self.maxbytes = maxsize, maxbytes
+        if sizeof is None:
+            sizeof = lambda obj: 0
+        self.sizeof = sizeof
+        self._data = OrderedDict()
+        self.nbytes = 0
+        self.hits, self.misses, self.evictions = 0, 0, 0
+    def __getitem__(self, key):
+        try:
+            obj, nbytes = self._data[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        self._put(key, obj)
+        return obj
+    def __setitem__(self, key, obj):
+        if self.maxsize == 0:
+            return
+        self._put(key, obj)
+    def _put(self, key, obj):
+        try:
+            _, nbytes = self._data.pop(key)
+            self.nbytes -= nbytes
+        except KeyError:
+            pass
+        nbytes = self.sizeof(obj)
+        self._data[key] = (obj, nbytes)
+        self.nbytes += nbytes
+        self._trim()
+    def _trim(self):
+        while len(self._data) and (
+                (not self.maxsize is None and len(self._data) > self.maxsize)
+                or (not self.maxbytes is None and self.nbytes > self.maxbytes)
+                ):
+            _, (_, nbytes) = self._data.popitem(last = False)
+            self.nbytes -= nbytes
+            self.evictions += 1
+    def __delitem__(self, key):
+        _, nbytes = self._data.pop(key)
+        self.nbytes -= nbytes
+    def __contains__(self, key):
+        return key in self._data
+    def __len__(self):
+        return len(self._data)
+    def resize(self, maxsize = None, maxbytes = None):
+        self.maxsize, self.maxbytes = maxsize, maxbytes
+        self._trim()
+    def clear(self):
+        self._data.clear()
+        self.nbytes = 0
+    @property
+    def stats(self):
+        return dict(
+            hits = self.hits,
+            misses = self.misses,
+            evictions = self.evictions,
+            size = len(self),
+            nbytes = self.nbytes,
+            maxsize = self.maxsize,
+            maxbytes = self.maxbytes,
+            )
@@ -2,9 +2,31 @@ from types import FunctionType
 import builtins
 import operator
 
+import numpy as np
+
 from .pyklet import Pyklet
 from .utilities import w_hash
 from .prop import Prop
+from .value import Value, NullValueDetected
+
+def _compile_term(term):
+    # A function of no arguments returning the term's current plain value.
+    if type(term) is Prop and not term.open:
+        target = term.target
+        if not len(term.props):
+            return lambda: _plain(target)
+        getter = operator.attrgetter('.'.join(term.props))
+        return lambda: _plain(getter(target))
+    elif isinstance(term, Value):
+        return lambda: _plain(term)
+    else:
+        return lambda: term
+def _plain(obj):
+    if type(obj) is Value:
+        if obj.value is None:
+            raise NullValueDetected(obj)
+        return obj.plain
+    return obj
 
 class Comparator(Pyklet):
 
@@ -31,6 +53,14 @@ class Comparator(Pyklet):
         open = [t.open if isinstance(t, Prop) else False for t in self.terms]
         self.slots = len([t for t in open if t])
 
+        # Closed comparators may hold live values whose hash drifts:
+        self._cacheHash = not any(
+            isinstance(t, (Value, np.ndarray)) for t in self.terms
+            )
+        # pyklet terms (configs, mutants, props) may change in place,
+        # so are rechecked whenever the hash is asked for:
+        self._hashTerms = tuple(t for t in self.terms if isinstance(t, Pyklet))
+
     def _process_queryArgs(self, *queryArgs):
         if not len(queryArgs) == self.slots:
             raise ValueError("Not enough slots for query arguments.")
@@ -70,6 +100,36 @@ class Comparator(Pyklet):
             invert = self.invert
             )
 
+    def compile(self, *queryArgs):
+        '''
+        Returns a function of no arguments equivalent to \
+        bool(self.close(*queryArgs)), but with attribute lookups \
+        and operator dispatch resolved once, up front. \
+        Props are still read afresh on every call.
+        '''
+        if not len(queryArgs) == self.slots:
+            raise ValueError("Not enough slots for query arguments.")
+        queryArgs = iter(queryArgs)
+        getters = []
+        for t in self.terms:
+            if type(t) is Prop and t.target is None:
+                t = Prop(next(queryArgs), *t.props)
+            elif t is None:
+                t = next(queryArgs)
+            getters.append(_compile_term(t))
+        getters.extend([_compile_term(a) for a in queryArgs])
+        op = self.op
+        if self.asList:
+            fn = lambda: bool(op([g() for g in getters]))
+        elif len(getters) == 2:
+            g0, g1 = getters
+            fn = lambda: bool(op(g0(), g1()))
+        else:
+            fn = lambda: bool(op(*[g() for g in getters]))
+        if self.invert:
+            return lambda: not fn()
+        return fn
+
     def __bool__(self):
         return bool(self())
 
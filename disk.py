@@ -7,6 +7,9 @@ import h5py
 import numpy as np
 import string
 import time
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
 from contextlib import contextmanager
 from functools import wraps
 
@@ -56,6 +59,18 @@ class H5Manager:
         return os.path.join(*keys)
     def open(self):
         return H5Wrap(self)
+    def __contains__(self, key):
+        with H5Wrap(self):
+            return self._contains(key)
+    @mpi.dowrap
+    def _contains(self, key):
+        # expects h5filewrap
+        key = os.path.abspath(os.path.join(self.cwd, key))
+        parent, leaf = os.path.split(key)
+        if not parent in self.h5file:
+            return False
+        group = self.h5file[parent]
+        return leaf in group or leaf in group.attrs
     def merge_from(self, file2):
         merge(self, file2)
     def sub(self, *cwd):
@@ -153,6 +168,104 @@ def release(filename, password = ''):
 LOCKCODE = tempname()
 H5FILES = dict()
 
+class _Sessions:
+    '''
+    Counts the frame sessions open across threads. Any number of threads \
+    may hold sessions at once, but the background writer holds them alone.
+    '''
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.open = 0
+        self.writing = False
+    def acquire(self, writer = False):
+        with self._cond:
+            if writer:
+                self._cond.wait_for(lambda: not (self.open or self.writing))
+                self.writing = True
+            else:
+                self._cond.wait_for(lambda: not self.writing)
+                self.open += 1
+    def release(self, writer = False):
+        with self._cond:
+            if writer:
+                self.writing = False
+            else:
+                self.open -= 1
+            self._cond.notify_all()
+SESSIONS = _Sessions()
+_IOSTATE = threading.local()
+# The sessions holding each open file, across threads:
+_HOLDS = dict()
+_HOLDSLOCK = threading.Lock()
+
+class DeferredWrites:
+    '''
+    While active in a thread, collects the writes made by Writers \
+    (already processed, in the order made) instead of performing them, \
+    so that they can be handed to the background writer.
+    '''
+    _local = threading.local()
+    def __init__(self):
+        self.jobs = []
+    @classmethod
+    def get_active(cls):
+        return getattr(cls._local, 'active', None)
+    def __enter__(self):
+        self._formerActive = self.get_active()
+        self._local.active = self
+        return self
+    def __exit__(self, *args):
+        self._local.active = self._formerActive
+    def add(self, manager, func, *args, **kwargs):
+        self.jobs.append((manager, func, args, kwargs))
+    def run(self):
+        if not len(self.jobs):
+            return
+        # One session for all the jobs, as when they were made:
+        with H5Wrap(self.jobs[0][0]):
+            for manager, func, args, kwargs in self.jobs:
+                with H5Wrap(manager):
+                    func(*args, **kwargs)
+
+_WRITER = None
+_PENDING = []
+def submit_writes(deferred):
+    '''
+    Performs deferred writes in the background writer thread, \
+    in submission order, and returns the future. \
+    While any session is open the writer could not start, \
+    and the session may read what is being written, \
+    so the writes are instead performed at once.
+    '''
+    global _WRITER
+    if SESSIONS.open:
+        future = Future()
+        try:
+            deferred.run()
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        future.set_result(None)
+        return future
+    if _WRITER is None:
+        _WRITER = ThreadPoolExecutor(1, thread_name_prefix = 'everest-writer')
+    future = _WRITER.submit(_run_writes, deferred)
+    _PENDING.append(future)
+    return future
+def _run_writes(deferred):
+    _IOSTATE.writer = True
+    deferred.run()
+def wait_writes():
+    '''
+    Blocks until all background writes have completed, \
+    raising the first error encountered, if any.
+    '''
+    if getattr(_IOSTATE, 'writer', False):
+        return
+    while len(_PENDING):
+        _PENDING.pop(0).result()
+atexit.register(wait_writes)
+
 class H5Wrap:
     def __init__(self, arg):
         self.arg = arg
@@ -164,39 +277,59 @@ class H5Wrap:
     @mpi.dowrap
     def _open_h5file(self):
         global H5FILES
-        if hasattr(self, 'h5file'):
-            return False
-        elif self.filename in H5FILES:
-            self.arg.h5file = H5FILES[self.filename]
-            return False
-        else:
-            self.arg.h5file = h5py.File(self.arg.h5filename, 'a')
-            H5FILES[self.filename] = self.arg.h5file
-            return True
+        if not self.filename in H5FILES:
+            H5FILES[self.filename] = h5py.File(self.arg.h5filename, 'a')
+        self.arg.h5file = H5FILES[self.filename]
     def __enter__(self):
-        while True:
-            try:
-                self.master = lock(self.lockfilename, self.lockcode)
-                break
-            except AccessForbidden:
-                random_sleep(0.1, 5.)
-        self.opener = self._open_h5file()
+        depth = getattr(_IOSTATE, 'depth', 0)
+        self.background = getattr(_IOSTATE, 'writer', False)
+        if not depth:
+            if not self.background and not SESSIONS.open:
+                # Frames are only read or written once pending writes land:
+                wait_writes()
+            SESSIONS.acquire(self.background)
+        _IOSTATE.depth = depth + 1
+        try:
+            # The file is locked and opened by the first session to hold it
+            # and closed by the last, whichever threads those are:
+            with _HOLDSLOCK:
+                if not _HOLDS.get(self.filename, 0):
+                    while True:
+                        try:
+                            lock(self.lockfilename, self.lockcode)
+                            break
+                        except AccessForbidden:
+                            random_sleep(0.1, 5.)
+                self._open_h5file()
+                _HOLDS[self.filename] = _HOLDS.get(self.filename, 0) + 1
+        except BaseException:
+            self._leave()
+            raise
         # if self.master:
         #     mpi.message("Logging in at", time.time())
         return None
     @mpi.dowrap
     def _close_h5file(self):
         global H5FILES
-        if self.opener:
-            self.arg.h5file.flush()
-            self.arg.h5file.close()
-            del self.arg.h5file
-            del H5FILES[self.filename]
+        h5file = H5FILES.pop(self.filename)
+        h5file.flush()
+        h5file.close()
+        del self.arg.h5file
     def __exit__(self, *args):
-        self._close_h5file()
-        if self.master:
-            # mpi.message("Logging out at", time.time())
-            release(self.lockfilename, self.lockcode)
+        try:
+            with _HOLDSLOCK:
+                _HOLDS[self.filename] -= 1
+                if not _HOLDS[self.filename]:
+                    del _HOLDS[self.filename]
+                    self._close_h5file()
+                    # mpi.message("Logging out at", time.time())
+                    release(self.lockfilename, self.lockcode)
+        finally:
+            self._leave()
+    def _leave(self):
+        _IOSTATE.depth -= 1
+        if not _IOSTATE.depth:
+            SESSIONS.release(self.background)
 
 class SetMask:
     # expects @mpi.dowrap
@@ -275,11 +408,18 @@ def local_import(filepath):
     return module
 
 
+INLINESCRIPTS = dict()
+
 def local_import_from_str(scriptString):
     with TempFile(
                 scriptString,
                 extension = 'py'
                 ) \
             as tempfile:
-        imported = local_import(tempfile)
+        # Lets importers see the source without rereading the temp file:
+        INLINESCRIPTS[tempfile] = scriptString
+        try:
+            imported = local_import(tempfile)
+        finally:
+            del INLINESCRIPTS[tempfile]
     return imported
@@ -9,4 +9,7 @@ _EVALTAG_ = '_eval_'
 _GHOSTTAG_ = '_ghost_'
 _GROUPTAG_ = '_grouptag_'
 _GLOBALSTAG_ = '_globals_'
+_SCRIPTTAG_ = '_script_'
+_SCRIPTSDIR_ = '_scripts_'
+_INDEXTAG_ = '_index_'
 _DIRECTORY_ = os.path.abspath(os.path.dirname(__file__))
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import re
+import struct
+import warnings
+from collections.abc import Mapping, Set, Iterable
+
+import numpy as np
+
+_packlen = struct.Struct('<Q').pack
+_packfloat = struct.Struct('<d').pack
+
+class _NotPlain(Exception):
+    pass
+
+_LEAVES = frozenset((str, int, float, bool, type(None)))
+_STRS = frozenset((str,))
+def _str_keyed(obj):
+    # Whether every dict nested in obj (through dicts, lists and tuples)
+    # has only str keys, which JSON keeps as they are:
+    if isinstance(obj, dict):
+        if not _STRS.issuperset(map(type, obj)):
+            for key in obj:
+                if not isinstance(key, str):
+                    return False
+        subs = obj.values()
+    elif isinstance(obj, (list, tuple)):
+        subs = obj
+    else:
+        return True
+    if not _LEAVES.issuperset(map(type, subs)):
+        for sub in subs:
+            if not (type(sub) in _LEAVES or _str_keyed(sub)):
+                return False
+    return True
+
+def _plain_default(obj):
+    # Stands in for values equal to plain ones; anything else is refused.
+    if isinstance(obj, np.generic):
+        return obj.item()
+    elif hasattr(obj, 'hashID') or hasattr(obj, 'typeHash'):
+        raise _NotPlain
+    elif hasattr(obj, '_hashObjects'):
+        out = obj._hashObjects
+    elif isinstance(obj, Mapping):
+        out = dict(obj)
+    elif isinstance(obj, (Set, np.ndarray, bytes, bytearray, complex)):
+        raise _NotPlain
+    elif isinstance(obj, Iterable) and not iter(obj) is obj:
+        # (iterators are left to the Hasher, which consumes them once)
+        out = list(obj)
+    else:
+        raise _NotPlain
+    if not _str_keyed(out):
+        raise _NotPlain
+    return out
+
+_plain_encode = json.JSONEncoder(
+    sort_keys = True,
+    separators = (',', ':'),
+    check_circular = False,
+    default = _plain_default,
+    ).encode
+
+# Where JSON may have written a non-str key as a string:
+_COERCIBLE = re.compile(r'[{,]"(-?[0-9]|-?Infinity"|NaN"|true"|false"|null")')
+def _encode_plain(obj):
+    # One canonical string for trees of builtin scalars, strings,
+    # sequences and str-keyed dicts (or values equal to them),
+    # encoded in C; raises _NotPlain for anything else.
+    try:
+        text = _plain_encode(obj)
+    except (TypeError, ValueError):
+        raise _NotPlain
+    if _COERCIBLE.search(text) and not _str_keyed(obj):
+        raise _NotPlain
+    return b'j' + text.encode()
+
+class Hasher:
+    '''
+    Feeds arbitrary objects into a single incremental blake2b state. \
+    Containers are walked directly and arrays are hashed from their \
+    raw buffers (with dtype and shape), so no intermediate strings \
+    are built and large arrays never collide on a truncated repr. \
+    Objects carrying a 'hashID', 'typeHash' or '_hashObjects' are \
+    hashed through those, as with utilities.make_hash. \
+    Every leaf has one encoding wherever it appears, \
+    so equal values (e.g. 0.5 and np.float64(0.5)) hash alike. \
+    Plain trees (builtin scalars, strings, sequences, str-keyed dicts), \
+    which most inputs are, are instead encoded whole as canonical JSON.
+    '''
+
+    def __init__(self, *objs, digest_size = 16):
+        self._state = hashlib.blake2b(digest_size = digest_size)
+        self._buffer = bytearray()
+        self.digest_size = digest_size
+        for obj in objs:
+            self.update(obj)
+
+    def update(self, obj):
+        # Plain trees (most inputs) are encoded in one pass,
+        # other objects node by node:
+        try:
+            self._buffer += _encode_plain(obj)
+        except _NotPlain:
+            self._feed(obj)
+        return self
+
+    def _flush(self):
+        # Small items are gathered in a buffer to save per-call overhead.
+        if len(self._buffer):
+            self._state.update(self._buffer)
+            self._buffer.clear()
+
+    def digest(self):
+        self._flush()
+        return self._state.digest()
+    def hexdigest(self):
+        self._flush()
+        return self._state.hexdigest()
+    def intdigest(self):
+        return int.from_bytes(self.digest(), 'big')
+
+    def _feed(self, obj):
+        try:
+            method = self._typemethods[type(obj)]
+        except KeyError:
+            method = type(self)._feed_other
+        method(self, obj)
+
+    def _feed_str(self, obj):
+        data = obj.encode()
+        self._buffer += b's' + _packlen(len(data)) + data
+    def _feed_bytes(self, obj):
+        self._buffer += b'b' + _packlen(len(obj)) + obj
+    def _feed_bool(self, obj):
+        self._buffer += b'T' if obj else b'F'
+    def _feed_none(self, obj):
+        self._buffer += b'N'
+    def _feed_int(self, obj):
+        self._buffer += b'i' + str(obj).encode() + b';'
+    def _feed_float(self, obj):
+        self._buffer += b'f' + _packfloat(obj)
+    def _feed_complex(self, obj):
+        self._buffer += b'c' + _packfloat(obj.real) + _packfloat(obj.imag)
+    def _feed_array(self, obj):
+        self._buffer += b'a' + obj.dtype.str.encode() + b'|' \
+            + _packlen(obj.ndim) + b''.join(_packlen(n) for n in obj.shape)
+        if obj.dtype.hasobject:
+            for sub in obj.flat:
+                self._feed(sub)
+        elif obj.nbytes < 1024:
+            self._buffer += np.ascontiguousarray(obj).tobytes()
+        else:
+            self._flush()
+            self._state.update(np.ascontiguousarray(obj).data)
+    def _feed_sequence(self, obj):
+        self._buffer += b'l' + _packlen(len(obj))
+        feed = self._feed
+        for sub in obj:
+            feed(sub)
+    def _feed_mapping(self, obj):
+        items = list(obj.items())
+        try:
+            items.sort(key = lambda item: item[0])
+        except TypeError:
+            warnings.warn(
+                "You have passed unorderable kwargs to be hashed; \
+                reproducibility is not guaranteed."
+                )
+        self._buffer += b'm' + _packlen(len(items))
+        feed = self._feed
+        for key, val in items:
+            feed(key)
+            feed(val)
+    def _feed_set(self, obj):
+        subdigests = sorted(
+            type(self)(sub, digest_size = self.digest_size).digest()
+                for sub in obj
+            )
+        self._buffer += b'S' + _packlen(len(subdigests))
+        for subdigest in subdigests:
+            self._buffer += subdigest
+    def _feed_other(self, obj):
+        if hasattr(obj, 'hashID'):
+            self._buffer += b'h'
+            self._feed_str(str(obj.hashID))
+        elif hasattr(obj, 'typeHash'):
+            self._buffer += b'h'
+            self._feed_str(str(obj.typeHash))
+        elif hasattr(obj, '_hashObjects'):
+            self._feed(obj._hashObjects)
+        elif isinstance(obj, np.ndarray):
+            self._feed_array(obj)
+        elif isinstance(obj, np.generic):
+            self._feed(obj.item())
+        elif isinstance(obj, Mapping):
+            self._feed_mapping(obj)
+        elif isinstance(obj, Set):
+            self._feed_set(obj)
+        elif isinstance(obj, (str, bytes, int, float, complex)):
+            self._typemethods[
+                [t for t in (str, bytes, int, float, complex) \
+                    if isinstance(obj, t)][0]
+                ](self, obj)
+        elif isinstance(obj, Iterable):
+            self._feed_sequence(list(obj))
+        else:
+            self._buffer += b'r'
+            self._feed_str(str(obj))
+
+    _typemethods = {
+        str: _feed_str,
+        bytes: _feed_bytes,
+        bytearray: _feed_bytes,
+        bool: _feed_bool,
+        type(None): _feed_none,
+        int: _feed_int,
+        float: _feed_float,
+        complex: _feed_complex,
+        np.ndarray: _feed_array,
+        tuple: _feed_sequence,
+        list: _feed_sequence,
+        dict: _feed_mapping,
+        set: _feed_set,
+        frozenset: _feed_set,
+        }
+
+def content_digest(obj, digest_size = 16):
+    '''
+    The digest of Hasher(obj), skipping the incremental state \
+    for plain trees of builtins, which are hashed in one call.
+    '''
+    try:
+        data = _encode_plain(obj)
+    except _NotPlain:
+        return Hasher(obj, digest_size = digest_size).digest()
+    return hashlib.blake2b(data, digest_size = digest_size).digest()
+
+def content_hash(obj):
+    return content_digest(obj).hex()
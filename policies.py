@@ -0,0 +1,117 @@
+import math
+import weakref
+
+import numpy as np
+
+from .comparator import Comparator
+
+from .exceptions import EverestException
+from .builts import MissingMethod
+class PolicyException(EverestException):
+    pass
+class PolicyMissingMethod(MissingMethod, PolicyException):
+    pass
+
+class StoragePolicy:
+    '''
+    Decides, when a producer is asked to store, \
+    whether its current outputs should be kept.
+    '''
+    def __init__(self, key = 'count'):
+        self.key = key
+    def _value(self, producer):
+        return producer.outs[self.key]
+    def __call__(self, producer):
+        return self._keep(producer)
+    def _keep(self, producer):
+        raise PolicyMissingMethod
+
+class Every(StoragePolicy):
+    '''Keeps rows whose 'key' output is a multiple of n.'''
+    def __init__(self, n, key = 'count'):
+        self.n = n
+        super().__init__(key)
+    def _keep(self, producer):
+        try:
+            return int(self._value(producer)) % self.n == 0
+        except TypeError:
+            return True
+
+class LogSpaced(StoragePolicy):
+    '''
+    Keeps the first row offered in each of 'perDecade' logarithmically \
+    spaced bins per power of 'base' of the 'key' output, \
+    however often the producer stores.
+    '''
+    def __init__(self, perDecade = 10, base = 10., key = 'count'):
+        self.perDecade, self.base = perDecade, base
+        # id(producer) -> [weakref to producer, bin last kept]:
+        self._lastBins = dict()
+        super().__init__(key)
+    def _bin(self, val):
+        if val < 1:
+            return -1
+        return math.floor(math.log(val, self.base) * self.perDecade + 1e-9)
+    def _keep(self, producer):
+        try:
+            val = int(self._value(producer))
+        except TypeError:
+            return True
+        valBin = self._bin(val)
+        key = id(producer)
+        try:
+            ref, lastBin = self._lastBins[key]
+            if not ref() is producer:
+                raise KeyError(key)
+        except KeyError:
+            ref = weakref.ref(
+                producer, lambda _: self._lastBins.pop(key, None)
+                )
+            lastBin = None
+        if valBin == lastBin:
+            return False
+        self._lastBins[key] = [ref, valBin]
+        return True
+
+class When(StoragePolicy):
+    '''
+    Keeps rows for which a Comparator fires; an open comparator \
+    is called with the producer as its query argument.
+    '''
+    def __init__(self, comparator):
+        if not isinstance(comparator, Comparator):
+            raise TypeError(type(comparator))
+        self.comparator = comparator
+        super().__init__(None)
+    def _keep(self, producer):
+        if self.comparator.slots:
+            return self.comparator(producer)
+        return bool(self.comparator)
+
+class Retention:
+    '''
+    Thins saved rows by age, measured in the 'key' output back from \
+    its latest value. Each tier is a pair (window, stride): rows whose \
+    age falls within the tier's window (after those of earlier tiers) \
+    are kept if their key is a multiple of stride; a window of None \
+    is unbounded, and rows older than every tier are dropped. \
+    E.g. Retention((1000, 1), (None, 100)) keeps the last 1000 counts \
+    dense and every hundredth count before that.
+    '''
+    def __init__(self, *tiers, key = 'count'):
+        if not len(tiers):
+            raise ValueError("At least one tier must be provided.")
+        self.tiers, self.key = tiers, key
+    def __call__(self, values):
+        values = np.asarray(values)
+        if not len(values):
+            return np.ones(0, dtype = bool)
+        age = values.max() - values
+        keep = np.zeros(len(values), dtype = bool)
+        lower = 0
+        for window, stride in self.tiers:
+            upper = np.inf if window is None else lower + window
+            inTier = (age >= lower) & (age < upper)
+            keep |= inTier & (values % stride == 0)
+            lower = upper
+        return keep
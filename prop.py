@@ -18,6 +18,9 @@ class Prop(Pyklet):
 
         self.open = self.target is None
 
+        if isinstance(target, Pyklet):
+            self._hashTerms = (target,)
+
     def __call__(self, obj = None):
 
         if obj is None:
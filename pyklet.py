@@ -23,14 +23,33 @@ class Pyklet:
     @classmethod
     def _unpickle(cls, args, kwargs):
         return cls(*args, **kwargs)
+    _cacheHash = True
+    # Pyklets whose hashes feed this one's; a cached hash is dropped
+    # as soon as any of theirs changes:
+    _hashTerms = ()
     @property
     def contentHash(self):
+        if self._hashTerms:
+            termHashes = tuple(t.contentHash for t in self._hashTerms)
+            if not termHashes == self.__dict__.get('_termHashes'):
+                self._invalidate_hash()
+                self.__dict__['_termHashes'] = termHashes
+        try:
+            return self.__dict__['_contentHash']
+        except KeyError:
+            pass
         if hasattr(self, '_hashID'):
-            return self._hashID()
-        if hasattr(self, '_hashObjects'):
-            return w_hash(self._hashObjects)
+            contentHash = self._hashID()
+        elif hasattr(self, '_hashObjects'):
+            contentHash = w_hash(self._hashObjects)
         else:
-            return w_hash(self._pickleObjs)
+            contentHash = w_hash(self._pickleObjs)
+        if self._cacheHash:
+            self.__dict__['_contentHash'] = contentHash
+        return contentHash
+    def _invalidate_hash(self):
+        # Call whenever content that feeds the hash is changed in place.
+        self.__dict__.pop('_contentHash', None)
     @property
     def hashID(self):
         return type(self).__name__ + '{' + self.contentHash + '}'
@@ -17,16 +17,30 @@ from .scope import Scope
 from .globevars import \
     _BUILTTAG_, _CLASSTAG_, _ADDRESSTAG_, \
     _BYTESTAG_, _STRINGTAG_, _EVALTAG_, \
-    _GROUPTAG_, _GLOBALSTAG_
+    _GROUPTAG_, _GLOBALSTAG_, _SCRIPTTAG_, _INDEXTAG_
 from .exceptions import EverestException, InDevelopmentError
 from .array import EverestArray
 from .utilities import Grouper
+from .scripts import find_script
 
 class PathNotInFrameError(EverestException, KeyError):
     pass
 class NotGroupError(EverestException, KeyError):
     pass
 
+# Below this many elements, a dataset is searched in a single read:
+_SEARCHBLOCK = 4096
+def _bisect_dataset(dataset, value):
+    # Leftmost insertion point of value in a sorted 1D dataset.
+    lo, hi = 0, len(dataset)
+    while hi - lo > _SEARCHBLOCK:
+        mid = (lo + hi) // 2
+        if dataset[mid] < value:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo + int(np.searchsorted(dataset[lo:hi], value))
+
 class Reader(H5Manager):
 
     def __init__(
@@ -116,6 +130,28 @@ class Reader(H5Manager):
         sought = self._pre_seekresolve(presought, _indices = _indices)
         return sought
 
+    def _unpack(self, inp):
+        # expects h5filewrap
+        if type(inp) is h5py.Group:
+            out = {key: self._unpack(sub) for key, sub in inp.items()}
+            out.update(inp.attrs)
+            return out
+        return self._pre_seekresolve(inp)
+
+    @mpi.dowrap
+    def _seek_many(self, keys):
+        # expects h5filewrap
+        # Reads several keys in one go, unpacking groups in full
+        # so that the results can be resolved without the file.
+        # Keys not found in the frame are left out of the output.
+        out = dict()
+        for key in keys:
+            try:
+                out[key] = self._unpack(self._recursive_seek(key))
+            except KeyError:
+                pass
+        return out
+
     @staticmethod
     def _process_tag(inp, tag):
         if inp.startswith(tag):
@@ -174,11 +210,70 @@ class Reader(H5Manager):
                 return out
             elif inp.startswith(_STRINGTAG_):
                 return self._process_tag(inp, _STRINGTAG_)
+            elif inp.startswith(_SCRIPTTAG_):
+                scriptDigest = self._process_tag(inp, _SCRIPTTAG_)
+                return find_script(scriptDigest, self.path)
             else:
                 raise ValueError(inp)
         else:
             raise TypeError(type(inp))
 
+    @disk.h5filewrap
+    def shape(self, key):
+        return self._shape(key)
+    @mpi.dowrap
+    def _shape(self, key):
+        # expects h5filewrap
+        key = os.path.abspath(os.path.join(self.cwd, key))
+        found = self._recursive_seek(key)
+        if not type(found) is h5py.Dataset:
+            raise NotGroupError(key)
+        return found.shape
+
+    @disk.h5filewrap
+    def search_index(self, key, value):
+        '''
+        Finds the first row at which the dataset 'key' holds 'value', \
+        by binary search over its sorted index (see Writer.reindex), \
+        reading O(log n) elements. Raises ValueError if it is absent, \
+        or PathNotInFrameError if there is no index.
+        '''
+        return self._search_index(key, value)
+    @mpi.dowrap
+    def _search_index(self, key, value):
+        # expects h5filewrap
+        indexKey = os.path.abspath(
+            os.path.join(self.cwd, _INDEXTAG_, key)
+            )
+        index = self._recursive_seek(indexKey)
+        values, rows = index['values'], index['rows']
+        pos = _bisect_dataset(values, value)
+        if pos < len(values) and values[pos] == value:
+            return int(rows[pos])
+        raise ValueError(value)
+    @disk.h5filewrap
+    def floor_index(self, key, value):
+        '''
+        Like search_index, but finds the greatest indexed value \
+        at or below 'value', returning it with its row. \
+        Raises ValueError if there is none.
+        '''
+        return self._floor_index(key, value)
+    @mpi.dowrap
+    def _floor_index(self, key, value):
+        # expects h5filewrap
+        indexKey = os.path.abspath(
+            os.path.join(self.cwd, _INDEXTAG_, key)
+            )
+        index = self._recursive_seek(indexKey)
+        values, rows = index['values'], index['rows']
+        pos = _bisect_dataset(values, value)
+        if not (pos < len(values) and values[pos] == value):
+            if pos == 0:
+                raise ValueError(value)
+            pos -= 1
+        return values[pos][()], int(rows[pos])
+
     def getfrom(self, *keys):
         return self.__getitem__(os.path.join(*keys))
 
@@ -0,0 +1,110 @@
+import os
+import tempfile
+
+from . import mpi
+from .cache import digest
+from .globevars import _SCRIPTSDIR_
+
+from .exceptions import EverestException
+class ScriptStoreException(EverestException):
+    pass
+class ScriptNotFound(ScriptStoreException, KeyError):
+    pass
+class ScriptMismatch(ScriptStoreException):
+    pass
+
+def _default_scriptstore():
+    return os.environ.get('EVEREST_SCRIPTSTORE', '') or None
+SCRIPTSTORE = _default_scriptstore()
+
+def set_script_store(path = None, inline = False):
+    '''
+    Sets where class scripts are kept when frames are written: \
+    by default, in a '_scripts_' directory beside each frame; \
+    if 'path' is given, in that one directory for all frames; \
+    or, if 'inline' is True, inside each frame itself as before.
+    '''
+    global SCRIPTSTORE
+    if inline:
+        SCRIPTSTORE = 'inline'
+    elif path is None:
+        SCRIPTSTORE = None
+    else:
+        SCRIPTSTORE = os.path.abspath(path)
+
+def get_script_store(framePath):
+    if SCRIPTSTORE == 'inline':
+        return None
+    elif SCRIPTSTORE is None:
+        return ScriptStore(os.path.join(framePath, _SCRIPTSDIR_))
+    else:
+        return ScriptStore(SCRIPTSTORE)
+
+def find_script(scriptDigest, framePath):
+    stores = [
+        get_script_store(framePath),
+        ScriptStore(os.path.join(framePath, _SCRIPTSDIR_)),
+        ]
+    for store in stores:
+        if store is None:
+            continue
+        try:
+            return store[scriptDigest]
+        except ScriptNotFound:
+            pass
+    raise ScriptNotFound(scriptDigest)
+
+class ClassScript:
+    '''
+    Stands in for a class's script when written to a frame, \
+    so that the writer can store it by reference.
+    '''
+    def __init__(self, cls):
+        self.cls = cls
+    @property
+    def script(self):
+        return self.cls.script
+    @property
+    def digest(self):
+        return self.cls._scriptDigest
+
+class ScriptStore:
+    '''
+    A directory of class scripts addressed by the digest of their \
+    content, so that any number of frames may refer to one copy. \
+    Scripts are written once, atomically, and never modified.
+    '''
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+    def _filename(self, scriptDigest):
+        return os.path.join(self.path, scriptDigest + '.py')
+    @mpi.dowrap
+    def __contains__(self, scriptDigest):
+        return os.path.exists(self._filename(scriptDigest))
+    @mpi.dowrap
+    def add(self, classScript):
+        script, scriptDigest = classScript.script, classScript.digest
+        if not digest(script) == scriptDigest:
+            raise ScriptMismatch(scriptDigest)
+        filename = self._filename(scriptDigest)
+        if os.path.exists(filename):
+            return
+        os.makedirs(self.path, exist_ok = True)
+        fd, tempname = tempfile.mkstemp(dir = self.path, suffix = '.tmp')
+        try:
+            with os.fdopen(fd, 'w') as file:
+                file.write(script)
+            os.replace(tempname, filename)
+        except BaseException:
+            os.remove(tempname)
+            raise
+    @mpi.dowrap
+    def __getitem__(self, scriptDigest):
+        try:
+            with open(self._filename(scriptDigest)) as file:
+                script = file.read()
+        except FileNotFoundError:
+            raise ScriptNotFound(scriptDigest)
+        if not digest(script) == scriptDigest:
+            raise ScriptNotFound(scriptDigest)
+        return script
@@ -0,0 +1,73 @@
+import os
+import shutil
+import threading
+
+from everest import mpi
+from everest import disk
+from everest.anchor import Anchor
+from everest.builts.examples.pimachine import PiMachine
+
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backgroundout')
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+    os.makedirs(path)
+
+def in_thread(func, *args):
+    # runs func in another thread, failing rather than hanging
+    errors = []
+    def target():
+        try:
+            func(*args)
+        except BaseException as error:
+            errors.append(error)
+    worker = threading.Thread(target = target, daemon = True)
+    worker.start()
+    worker.join(30.)
+    assert not worker.is_alive(), "Deadlocked."
+    if len(errors):
+        raise errors[0]
+
+mpi.message("Checking background saves inside open sessions...")
+
+pm = PiMachine()
+
+def nested_save():
+    with Anchor('background', path):
+        with disk.H5Wrap(pm.writer):
+            for i in range(3):
+                pm.iterate(3)
+                pm.store()
+                pm.save(background = True, wait = True)
+            # written at once, so later saves see them:
+            assert not len(disk._PENDING)
+            assert pm.indicesDisk['count'] == [3, 6, 9]
+            pm.reset()
+            pm.iterate(6)
+            pm.store()
+            pm.save(background = True, silent = True)
+            assert pm.indicesDisk['count'] == [3, 6, 9]
+in_thread(nested_save)
+
+mpi.message("Checking reads from other threads during sessions...")
+
+def read_counts(readouts, out):
+    out.append(list(readouts['count']))
+
+with Anchor('background', path):
+    # while this thread holds a session:
+    with disk.H5Wrap(pm.readouts):
+        out = []
+        in_thread(read_counts, pm.readouts, out)
+        assert out == [[3, 6, 9]]
+    # while a background write is pending:
+    pm.iterate(6)
+    pm.store()
+    pm.save(background = True)
+    out = []
+    in_thread(read_counts, pm.readouts, out)
+    assert out == [[3, 6, 9, 12]]
+
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+
+mpi.message("Complete!")
@@ -0,0 +1,52 @@
+from timeit import timeit
+from collections import OrderedDict
+
+import numpy as np
+
+from everest import mpi
+from everest.utilities import make_hash
+from everest.hashing import content_hash
+
+mpi.message("Benchmarking make_hash against content_hash...")
+
+row = OrderedDict([
+    ('count', 1234),
+    ('pi', np.array(3.141592653589793)),
+    ('field', np.random.rand(64, 64)),
+    ])
+inputs = OrderedDict([
+    ('s', 1),
+    ('b', 16),
+    ('A', [4, 0, 0, -2, -1, -1, 0, 0]),
+    ('name', 'pimachine'),
+    ('nested', {'a': [1, 2, 3], 'b': ('x', 'y'), 'c': 0.5}),
+    ])
+big = np.random.rand(1000, 1000)
+
+cases = [
+    ('outs row', lambda: row.values(), 2000),
+    ('inputs dict', lambda: inputs, 2000),
+    ('1e6 array', lambda: big, 20),
+    ]
+speedups = dict()
+for label, obj, number in cases:
+    obj = obj()
+    tOld = timeit(lambda: make_hash(obj), number = number) / number
+    tNew = timeit(lambda: content_hash(obj), number = number) / number
+    mpi.message(
+        label + ':',
+        'make_hash', '%.2e' % tOld, 's;',
+        'content_hash', '%.2e' % tNew, 's;',
+        'speedup', '%.1fx' % (tOld / tNew),
+        )
+    speedups[label] = tOld / tNew
+# Most inputs are plain, and are encoded whole:
+assert speedups['inputs dict'] > 1.
+
+other = big.copy()
+other[500, 500] += 1.
+assert content_hash(big) != content_hash(other)
+if make_hash(big) == make_hash(other):
+    mpi.message("make_hash collides on arrays differing mid-buffer.")
+
+mpi.message("Complete!")
@@ -0,0 +1,65 @@
+from timeit import timeit
+
+from everest import mpi
+from everest.utilities import make_hash
+from everest.comparator import Comparator
+from everest.prop import Prop
+from everest.builts._wanderer import State
+
+from walker import Walker
+
+mpi.message("Benchmarking hash-heavy paths...")
+
+walker = Walker()
+configs = walker.configs
+
+def report(label, cached, raw, number):
+    tCached = timeit(cached, number = number) / number
+    tRaw = timeit(raw, number = number) / number
+    mpi.message(
+        label + ':',
+        'cached', '%.2e' % tCached, 's;',
+        'recomputed', '%.2e' % tRaw, 's;',
+        'speedup', '%.1fx' % (tRaw / tCached),
+        )
+
+report(
+    'Configs.id',
+    lambda: configs.id,
+    lambda: configs._hashID(),
+    10000,
+    )
+report(
+    'Built.__hash__',
+    lambda: {walker: None},
+    lambda: {int(make_hash(walker.hashID)): None},
+    10000,
+    )
+state = State.get_state(walker, slice(None, 5))
+report(
+    'State.hashID',
+    lambda: state.hashID,
+    lambda: state._hashID(),
+    10000,
+    )
+number = 200
+tGet = timeit(
+    lambda: State.get_state(walker, slice(None, 5)),
+    number = number
+    ) / number
+mpi.message('State.get_state:', '%.2e' % tGet, 's')
+
+prevID = configs.id
+comparator = Comparator(configs, Prop(configs, 'x'), op = 'eq')
+prop = comparator.terms[1]
+prevHashes = comparator.hashID, prop.hashID
+configs['x'] = 1.
+assert configs.id != prevID
+# holders of the configs follow them:
+assert comparator.hashID != prevHashes[0] and prop.hashID != prevHashes[1]
+assert comparator.hashID == Comparator(*comparator.terms, op = 'eq').hashID
+configs['x'] = 0.
+assert configs.id == prevID
+assert (comparator.hashID, prop.hashID) == prevHashes
+
+mpi.message("Complete!")
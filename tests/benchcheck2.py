@@ -0,0 +1,45 @@
+from timeit import default_timer as timer
+
+from everest import mpi
+from everest.builts import Built, Meta
+
+class Point(Built):
+    def __init__(self,
+            a = 0,
+            b = 0.,
+            c = ('x', 'y'),
+            **kwargs
+            ):
+        super().__init__(**kwargs)
+
+N = 100000
+
+mpi.message("Benchmarking construction of", N, "builts...")
+
+def construct(n):
+    return [Point(i, i / 2., c = ('x', str(i % 10))) for i in range(n)]
+
+start = timer()
+held = construct(N)
+mpi.message('Cold:', '%.2e' % ((timer() - start) / N), 's per built')
+
+start = timer()
+again = construct(N)
+tWarm = (timer() - start) / N
+assert all(a is b for a, b in zip(held, again))
+mpi.message('Re-requested, memoised:', '%.2e' % tWarm, 's per built')
+
+fingerprints = Meta._fingerprints.copy()
+Meta._fingerprints.clear()
+start = timer()
+for i in range(N):
+    Meta._fingerprints.clear()
+    again[i] = Point(i, i / 2., c = ('x', str(i % 10)))
+tRehash = (timer() - start) / N
+assert all(a is b for a, b in zip(held, again))
+mpi.message('Re-requested, rehashed:', '%.2e' % tRehash, 's per built')
+Meta._fingerprints.update(fingerprints)
+
+mpi.message('Speedup:', '%.1fx' % (tRehash / tWarm))
+
+mpi.message("Complete!")
@@ -0,0 +1,41 @@
+import os
+import shutil
+from timeit import default_timer as timer
+
+from everest import mpi
+from everest.builts import Built
+
+class Point(Built):
+    def __init__(self,
+            a = 0,
+            b = 0.,
+            **kwargs
+            ):
+        super().__init__(**kwargs)
+
+N = 1000
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchout')
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+    os.makedirs(path)
+
+mpi.message("Benchmarking touch of a", N, "point sweep...")
+
+start = timer()
+for point in Point[{'a': range(N), 'b': [0.]}]:
+    point.touch('single', path)
+tSingle = timer() - start
+mpi.message('One at a time:', '%.2e' % tSingle, 's')
+
+start = timer()
+builts = Point[{'a': range(N, 2 * N), 'b': [0.]}].touch('batch', path)
+tBatch = timer() - start
+assert len(builts) == N
+mpi.message('Batched:', '%.2e' % tBatch, 's')
+
+mpi.message('Speedup:', '%.1fx' % (tSingle / tBatch))
+
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+
+mpi.message("Complete!")
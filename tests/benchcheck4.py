@@ -0,0 +1,69 @@
+from timeit import default_timer as timer
+
+import numpy as np
+
+from everest import mpi
+from everest.builts._producer import Outs
+
+N = 20000
+
+mpi.message("Benchmarking Outs with", N, "rows...")
+
+outs = Outs(['count', 'field'])
+field = np.random.rand(16)
+
+start = timer()
+for i in range(N):
+    outs.update({'count': np.int32(i), 'field': field + i})
+    outs.store()
+mpi.message('store:', '%.2e' % ((timer() - start) / N), 's per row')
+
+start = timer()
+stacked = dict(outs.zipstacked)
+mpi.message('stacked:', '%.2e' % (timer() - start), 's')
+assert stacked['field'].shape == (N, 16)
+assert np.shares_memory(stacked['count'], outs.stored['count'].view)
+
+start = timer()
+nbytes = outs.nbytes
+mpi.message('nbytes:', '%.2e' % (timer() - start), 's', nbytes)
+
+start = timer()
+for i in range(0, N, 7):
+    assert outs.index(count = i) == i
+mpi.message('index:', '%.2e' % ((timer() - start) / (N // 7)), 's per lookup')
+
+start = timer()
+outs.drop(range(N - 100, N - 50))
+mpi.message('drop near the end:', '%.2e' % (timer() - start), 's')
+outs.drop(range(0, N - 100, 2))
+assert outs.index(count = 3) == 1
+assert dict(zip(outs.keys(), outs.pop(-1)))['count'] == N - 1
+assert len(outs) == N // 2 - 1
+outs.clear()
+
+mpi.message("Checking row indices kept across drops...")
+
+def fresh(outs, k):
+    # the row index of k, rebuilt from scratch
+    rowIndex = dict()
+    for row, val in enumerate(outs.stored[k]):
+        rowIndex.setdefault(val, row)
+    return rowIndex
+outs = Outs(['count', 'phase'])
+for i in range(200):
+    # repeated values, so that first rows move between copies:
+    outs.update({'count': np.int32(i), 'phase': np.int32(i % 7)})
+    outs.store()
+for k in outs.keys():
+    outs._row_index(k)
+rng = np.random.default_rng(0)
+for drops in ([199], [100, 101, 150], list(rng.choice(180, 30, False)), [3]):
+    outs.drop(drops)
+    for k in outs.keys():
+        assert outs._rowIndices[k] == fresh(outs, k), (k, drops)
+    assert outs._hashSet == set(outs.hashVals)
+    assert len(outs.hashVals) == len(outs)
+assert len(outs) == 200 - 35
+
+mpi.message("Complete!")
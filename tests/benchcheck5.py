@@ -0,0 +1,48 @@
+import os
+import shutil
+from timeit import default_timer as timer
+
+from everest import mpi
+from everest.anchor import Anchor
+
+from walker import Walker
+
+N, M = 10, 8
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchout')
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+    os.makedirs(path)
+
+mpi.message("Benchmarking", N, "saves of", M, "steps each...")
+
+def run(name, background):
+    walker = Walker(size = 2 ** 18, unique = True)
+    with Anchor(name, path):
+        walker.initialise()
+        tSave = 0.
+        start = timer()
+        for i in range(N):
+            for j in range(M):
+                walker.iterate()
+                walker.store()
+            saveStart = timer()
+            walker.save(background = background)
+            tSave += timer() - saveStart
+        walker.save(wait = True, silent = True)
+        return timer() - start, tSave / N
+
+run('warmup', True)
+# Background saving shortens the time blocked in save, not the total,
+# since each save first waits for the last one's writes:
+for label, background in [('Foreground', False), ('Background', True)]:
+    tTotal, tSave = run(label.lower(), background)
+    mpi.message(
+        label + ':',
+        'total', '%.2e' % tTotal, 's;',
+        'blocked in save', '%.2e' % tSave, 's per call',
+        )
+
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+
+mpi.message("Complete!")
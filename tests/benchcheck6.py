@@ -0,0 +1,75 @@
+import os
+import shutil
+from timeit import default_timer as timer
+
+import numpy as np
+
+from everest import mpi
+from everest import disk
+from everest.anchor import Anchor
+from everest.builts._indexer import _as_records
+
+from walker import Walker
+
+N = 100000
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchout')
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+    os.makedirs(path)
+
+def fill(walker, counts):
+    for i in counts:
+        walker.outs.update({
+            'count': np.int32(i), 'x': np.float64(i), 'y': np.float64(-i)
+            })
+        walker.outs.store()
+
+mpi.message("Benchmarking clash detection at", N, "stored rows...")
+
+def report(label, func, number):
+    start = timer()
+    for i in range(number):
+        func()
+    t = (timer() - start) / number
+    mpi.message(label + ':', '%.2e' % t, 's')
+    return t
+
+walker = Walker(unique = True)
+with Anchor('clashes', path):
+    walker.initialise()
+    fill(walker, range(N))
+    walker.save(silent = True)
+    # half of these are already on disk:
+    fill(walker, range(N // 2, N + N // 2))
+    def cold():
+        walker._diskIndexCache.clear()
+        walker._disk_indices()
+    # as when saving, within one file session:
+    with disk.H5Wrap(walker.readouts):
+        report('Disk index read, cold', cold, 20)
+        report('Disk index read, cached', walker._disk_indices, 20)
+    diskColumns = list(walker._disk_indices().values())
+    storedColumns = [walker.outs.stored['count'].view]
+    report('Clash test (isin)', lambda: np.isin(
+        _as_records(storedColumns, diskColumns),
+        _as_records(diskColumns, storedColumns),
+        ), 20)
+    walker._indexer_drop_clashes()
+    assert len(walker.outs) == N // 2
+    # saving extends the cache rather than invalidating it:
+    walker.save(silent = True)
+    cached = walker._diskIndexCache[
+        (walker.readouts.h5filename, walker.outputKey)
+        ]
+    assert cached[0] == N + N // 2
+    # and the next check is served from it, not read again:
+    columns = walker._disk_indices()
+    assert all(columns[k] is v for k, v in cached[1].items())
+    fill(walker, range(N, 2 * N))
+    walker._indexer_drop_clashes()
+    assert len(walker.outs) == N // 2
+
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+
+mpi.message("Complete!")
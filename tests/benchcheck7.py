@@ -0,0 +1,44 @@
+from timeit import default_timer as timer
+
+from everest import mpi
+from everest.builts.examples.pimachine import PiMachine
+from everest.comparator import Comparator, Prop
+
+N = 20000
+
+mpi.message("Benchmarking", N, "steps of PiMachine to a stop condition...")
+
+pm = PiMachine()
+
+def interpreted():
+    # the loop as Voyager._go ran it before stop conditions were compiled
+    stop = Comparator(Prop(pm, 'indices', 'count'), N, op = 'ge')
+    while not stop:
+        pm.iterate()
+
+def compiled():
+    # not a plain count target, so only compilation applies
+    stop = Comparator(N, Prop(pm, 'indices', 'count'), op = 'le')
+    pm._go(stop)
+
+def bounded():
+    pm.go(N)
+
+for label, fn in [
+        ('Interpreted:', interpreted),
+        ('Compiled:', compiled),
+        ('Count target:', bounded),
+        ]:
+    pm.reset()
+    start = timer()
+    fn()
+    t = (timer() - start) / N
+    assert pm.indices.count == N
+    mpi.message(label, '%.2e' % t, 's per step')
+
+start = timer()
+for i in range(N):
+    pm._iterate()
+mpi.message('Bare steps:', '%.2e' % ((timer() - start) / N), 's per step')
+
+mpi.message("Complete!")
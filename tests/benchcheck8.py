@@ -0,0 +1,37 @@
+from timeit import default_timer as timer
+
+from everest import mpi
+from everest.builts.examples.pimachine import PiMachine
+
+N = 100000
+
+mpi.message("Benchmarking", N, "steps of PiMachine...")
+
+pm = PiMachine()
+
+def stepwise():
+    for i in range(N):
+        pm.iterate()
+
+def batched():
+    pm.iterate(N)
+
+def stored():
+    for i in range(N // 100):
+        pm.iterate(100)
+        pm.store()
+    pm.clear()
+
+for label, fn in [
+        ('One at a time:', stepwise),
+        ('Batched:', batched),
+        ('Batched, storing every 100:', stored),
+        ]:
+    pm.reset()
+    start = timer()
+    fn()
+    t = timer() - start
+    assert pm.indices.count == N
+    mpi.message(label, '%.3g' % (N / t), 'steps per second')
+
+mpi.message("Complete!")
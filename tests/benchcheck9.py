@@ -0,0 +1,76 @@
+import os
+import shutil
+from timeit import default_timer as timer
+
+import numpy as np
+
+from everest import mpi
+from everest.anchor import Anchor
+from everest.builts.examples.pimachine import PiMachine
+from everest.builts._chroner import Chroner
+from everest.builts.ensemble import Ensemble, EnsembleMismatch
+
+class TimedPi(PiMachine, Chroner):
+    def __init__(self,
+            # misc
+            **kwargs
+            ):
+        super().__init__(**kwargs)
+
+N, M = 1000, 100
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchout')
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+    os.makedirs(path)
+
+mpi.message("Benchmarking", M, "steps of", N, "PiMachines...")
+
+def sweep():
+    return [
+        PiMachine(s = 1 + i % 3, b = 2 + i // 3, unique = True) \
+            for i in range(N)
+        ]
+
+singles = sweep()
+start = timer()
+for pm in singles:
+    pm.iterate(M)
+tSingle = timer() - start
+mpi.message('One by one:', '%.3g' % (N * M / tSingle), 'steps per second')
+
+ensemble = Ensemble(sweep())
+start = timer()
+ensemble.iterate(M)
+tEnsemble = timer() - start
+mpi.message('Ensemble:', '%.3g' % (N * M / tEnsemble), 'steps per second')
+mpi.message('Speedup:', '%.1fx' % (tSingle / tEnsemble))
+
+assert all(m.indices.count == M for m in ensemble)
+assert np.allclose([m.state for m in singles], [m.state for m in ensemble])
+
+# only the count advances in lockstep, so a chron would go stale:
+try:
+    Ensemble([TimedPi(), TimedPi(s = 2)])
+    raise AssertionError
+except EnsembleMismatch:
+    pass
+
+with Anchor('ensemble', path):
+    ensemble.store()
+    ensemble.iterate(M)
+    ensemble.store()
+    start = timer()
+    ensemble.save()
+    tSave = timer() - start
+    mpi.message(
+        'Saved', N, 'members in', '%.2e' % tSave, 's;',
+        '%.2e' % (tSave / N), 's per member',
+        )
+    assert ensemble[-1].indicesDisk['count'] == [M, 2 * M]
+    ensemble[-1].load(M)
+    assert ensemble[-1].state == singles[-1].state
+
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+
+mpi.message("Complete!")
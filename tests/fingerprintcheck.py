@@ -0,0 +1,29 @@
+from everest import mpi
+from everest.builts import Built
+
+class Keyed(Built):
+    def __init__(self,
+            d = None,
+            **kwargs
+            ):
+        super().__init__(**kwargs)
+
+mpi.message("Checking that memoised builts tell input types apart...")
+
+# equal as values or keys, but not as inputs:
+for alike in [
+        [{1: 'x'}, {1.: 'x'}, {True: 'x'}],
+        [{'k': 1}, {'k': 1.}, {'k': True}],
+        [{(1, 2): 'x'}, {(1., 2): 'x'}],
+        [{0.: 'x'}, {-0.: 'x'}],
+        ]:
+    builts = [Keyed(d = d) for d in alike]
+    assert len(set(id(built) for built in builts)) == len(alike), alike
+    for d, built in zip(alike, builts):
+        assert Keyed(d = d) is built, d
+        assert Keyed(unique = True, d = d).hashID == built.hashID, d
+
+# key order does not matter:
+assert Keyed(d = {1: 'a', 2: 'b'}) is Keyed(d = {2: 'b', 1: 'a'})
+
+mpi.message("Complete!")
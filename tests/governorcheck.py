@@ -0,0 +1,44 @@
+import os
+import shutil
+
+from everest import mpi
+from everest.anchor import Anchor
+from everest.builts import set_memory_budget, memory_usage
+from everest.builts.examples.pimachine import PiMachine
+
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'governorout')
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+    os.makedirs(path)
+
+mpi.message("Checking the memory governor tells unique copies apart...")
+
+first = PiMachine(unique = True)
+second = PiMachine(unique = True)
+assert first.hashID == second.hashID and not first is second
+for pm in (first, second):
+    pm.iterate(3)
+    pm.store()
+usage = memory_usage()
+assert len(usage['producers']) == 2
+assert usage['nbytes'] == first.nbytes + second.nbytes
+
+# Over budget, the governor saves whichever copy it chooses,
+# and accounts for exactly that one:
+with Anchor('governor', path):
+    set_memory_budget(first.nbytes + second.nbytes, 'oldest')
+    second.iterate(3)
+    second.store()
+    assert not len(first.outs) and len(second.outs) == 2
+    assert memory_usage()['nbytes'] == second.nbytes
+    set_memory_budget(None)
+
+del first
+assert memory_usage()['nbytes'] == second.nbytes
+second.clear()
+assert memory_usage()['nbytes'] == 0
+
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+
+mpi.message("Complete!")
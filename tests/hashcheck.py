@@ -0,0 +1,46 @@
+import numpy as np
+
+from everest import mpi
+from everest.hashing import content_hash, Hasher
+from everest.builts import Built
+
+class Thing(Built):
+    def __init__(self,
+            a = 0,
+            b = 0.,
+            **kwargs
+            ):
+        super().__init__(**kwargs)
+
+mpi.message("Checking that equal values hash alike...")
+
+def same(*objs):
+    hashes = set(content_hash(obj) for obj in objs)
+    assert len(hashes) == 1, objs
+
+same(0.5, np.float64(0.5))
+same(3, np.int64(3), np.int32(3))
+same('x', np.str_('x'))
+same([3, 0.5], [3, np.float64(0.5)], (np.int64(3), 0.5))
+same([[3, 0.5]], [[3, np.float64(0.5)]], [(3, 0.5)])
+same({'a': 3, 'b': 0.5}, {'a': 3, 'b': np.float64(0.5)})
+same({'a': [1, 2]}, {np.str_('a'): [np.int64(1), 2]})
+# a leaf hashes the same whatever sits beside it:
+same([0.5, np.arange(3)], [np.float64(0.5), np.arange(3)])
+assert content_hash([1, 2]) != content_hash([2, 1])
+assert content_hash(1) != content_hash(1.)
+assert content_hash(0.5) != content_hash('0.5')
+# keys are not confused with their string forms:
+assert content_hash({1: 'x'}) != content_hash({'1': 'x'})
+assert content_hash([{None: 0}]) != content_hash([{'null': 0}])
+assert content_hash({'a': {1.5: 0}}) != content_hash({'a': {'1.5': 0}})
+# plain trees, encoded whole, hash as when fed through a Hasher:
+for obj in ({'a': [1, (2, 'x')], 'b': None}, [0.5, True], 'x'):
+    assert Hasher(obj).hexdigest() == content_hash(obj)
+
+assert Thing(a = 3, b = 0.5).hashID == Thing(a = 3, b = np.float64(0.5)).hashID
+sweep = [Thing(a = 3, b = b) for b in np.linspace(0., 1., 5)]
+plain = [Thing(a = 3, b = b) for b in [0., 0.25, 0.5, 0.75, 1.]]
+assert all(s is p for s, p in zip(sweep, plain))
+
+mpi.message("Complete!")
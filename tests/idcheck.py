@@ -0,0 +1,48 @@
+import os
+# Legacy IDs are chosen at import:
+os.environ['EVEREST_LEGACYIDS'] = '1'
+import sys
+import shutil
+import importlib
+
+from everest import mpi
+from everest.utilities import w_hash
+
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'idout')
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+    os.makedirs(path)
+mpi.comm.barrier()
+
+# The IDs below were produced by this source under the original scheme:
+source = """from everest.builts import Built
+class Thing(Built):
+    def __init__(self,
+            a = 0,
+            b = 0.,
+            c = 'x',
+            **kwargs
+            ):
+        super().__init__(**kwargs)
+"""
+if mpi.rank == 0:
+    with open(os.path.join(path, 'idthing.py'), 'w') as file:
+        file.write(source)
+mpi.comm.barrier()
+sys.path.insert(0, path)
+Thing = importlib.import_module('idthing').Thing
+
+mpi.message("Checking legacy IDs against those of old frames...")
+
+assert Thing().hashID == 'Napper-Bohnsdorf:novelistic-absconds'
+assert Thing(a = 3, b = 0.5).hashID == 'Napper-Bohnsdorf:inescapably-bracket'
+assert Thing(a = -1, b = 2.5, c = 'yz').hashID \
+    == 'Napper-Bohnsdorf:stadia-already'
+assert w_hash('hello') == 'adreeusaa-caotrxof'
+assert w_hash([1, 2.5, 'x']) == 'ahauejio-vueguitzae'
+
+sys.path.remove(path)
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+
+mpi.message("Complete!")
@@ -0,0 +1,247 @@
+import os
+import shutil
+import threading
+
+import numpy as np
+import h5py
+
+from everest import mpi
+from everest import disk
+from everest.anchor import Anchor
+from everest.reader import PathNotInFrameError
+from everest.policies import Retention
+from everest.builts._producer import Producer
+from everest.builts._indexer import JointIndex, IndexerLoadFail
+
+from timedwalker import TimedWalker
+from everest.builts._wanderer import Wanderer, StateVar
+
+class Walker(Wanderer):
+    def __init__(self,
+            # configs (_ghost_)
+            x = 0.,
+            # misc
+            **kwargs
+            ):
+        self.x = np.array(0.)
+        super().__init__(**kwargs)
+        self.mutables['x'] = StateVar(self, 'x')
+    def _out(self):
+        outs = super()._out()
+        outs['x'] = self.x.copy()
+        return outs
+    def _iterate(self):
+        self.x += 0.5
+        super()._iterate()
+    def _load_process(self, outs):
+        outs = super()._load_process(outs)
+        self.x[...] = outs.pop('x')
+        return outs
+
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'indexout')
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+    os.makedirs(path)
+
+def index_of(pm):
+    # the sorted on-disk index of counts, checked against the counts
+    with disk.H5Wrap(pm.readouts):
+        values = np.array(pm.readouts['_index_/count/values'])
+        rows = np.array(pm.readouts['_index_/count/rows'])
+        counts = np.array(pm.readouts['count'])
+    assert (np.diff(values) >= 0).all()
+    assert (counts[rows] == values).all()
+    assert len(values) == len(counts)
+    return values
+
+def store_counts(pm, counts):
+    for count in counts:
+        pm.go(count)
+        pm.store()
+
+mpi.message("Checking the sorted on-disk indices...")
+
+with Anchor('index', path):
+
+    pm = Walker(unique = True)
+    pm.initialise()
+    # appended in order:
+    store_counts(pm, [10, 20, 30])
+    pm.save()
+    assert list(index_of(pm)) == [10, 20, 30]
+    store_counts(pm, [40, 50])
+    pm.save()
+    assert list(index_of(pm)) == [10, 20, 30, 40, 50]
+    # out of order, so rebuilt:
+    pm.reset()
+    store_counts(pm, [5, 25])
+    pm.save()
+    assert list(index_of(pm)) == [5, 10, 20, 25, 30, 40, 50]
+    for count in (5, 25, 50):
+        row = pm.readouts.search_index('count', count)
+        assert pm.readouts['count'][row] == count
+    try:
+        pm.readouts.search_index('count', 26)
+        raise AssertionError
+    except ValueError:
+        pass
+
+    # Thinning rows drops the stale index...
+    pm.set_policies(retention = Retention((None, 10)))
+    with disk.H5Wrap(pm.writer):
+        Producer._retain(pm)
+    try:
+        pm.readouts.search_index('count', 10)
+        raise AssertionError
+    except PathNotInFrameError:
+        pass
+    # ...which the indexer rebuilds as it retains:
+    with disk.H5Wrap(pm.writer):
+        pm._retain()
+    assert list(index_of(pm)) == [10, 20, 30, 40, 50]
+    pm.set_policies()
+    store_counts(pm, [60])
+    pm.save()
+    assert list(index_of(pm)) == [10, 20, 30, 40, 50, 60]
+    for count in [10, 20, 30, 40, 50, 60]:
+        pm.load(count)
+        assert pm.indices.count == count
+        assert pm.x == count / 2.
+
+    # Loading from disk reads single rows, not whole datasets:
+    reads = []
+    def recorded(dataset, arg, *args, **kwargs):
+        reads.append((dataset.name, arg))
+        return datasetGet(dataset, arg, *args, **kwargs)
+    datasetGet = h5py.Dataset.__getitem__
+    h5py.Dataset.__getitem__ = recorded
+    try:
+        pm.load(30)
+    finally:
+        h5py.Dataset.__getitem__ = datasetGet
+    assert pm.x == 15.
+    outReads = [arg for name, arg in reads if not '_index_' in name]
+    assert len(outReads) and all(
+        type(arg) is slice and arg.stop - arg.start == 1 for arg in outReads
+        ), reads
+
+    mpi.message("Checking nearest loads across memory, in flight and disk...")
+
+    pm.reset()
+    store_counts(pm, [65])
+    # The background writer is held up until the gate opens
+    # (by a timer, lest a read in this thread waits on it forever):
+    gate = threading.Event()
+    runWrites = disk._run_writes
+    disk._run_writes = lambda deferred: (gate.wait(), runWrites(deferred))
+    try:
+        pm.save(background = True)
+        assert len(pm.inflightOuts) == 1
+        pm.iterate()
+        # held in flight, the outputs load without the disk:
+        pm.load(65)
+        assert not gate.is_set()
+        assert pm.indices.count == 65 and pm.x == 32.5
+        pm.iterate()
+        timer = threading.Timer(1., gate.set)
+        timer.start()
+        assert len(pm.inflightOuts) == 1
+        assert pm._nearest_index('count', 69) == 65
+    finally:
+        gate.set()
+        disk._run_writes = runWrites
+    disk.wait_writes()
+    assert not len(pm.inflightOuts)
+    store_counts(pm, [70])
+    assert pm.load_nearest(69) == 65
+    assert pm.load_nearest(72) == 70
+    assert pm.load_nearest(64) == 60
+    assert pm.load_nearest(20) == 20
+    try:
+        pm.load_nearest(9)
+        raise AssertionError
+    except IndexerLoadFail:
+        pass
+    assert list(index_of(pm)) == [10, 20, 30, 40, 50, 60, 65]
+
+    # go() replays forward from the nearest checkpoint:
+    steps = []
+    def counted():
+        steps.append(None)
+        Walker._iterate(pm)
+    pm._iterate = counted
+    pm.go(63)
+    assert pm.indices.count == 63 and len(steps) == 3
+    del steps[:]
+    pm.go(68)
+    assert pm.indices.count == 68 and len(steps) == 3
+    del steps[:]
+    pm.go(69)
+    assert len(steps) == 1
+    del pm._iterate
+    reference = Walker(unique = True)
+    reference.iterate(69)
+    assert reference.indices.count == pm.indices.count
+    assert reference.x == pm.x
+
+    mpi.message("Checking latest loads by chron...")
+
+    tw = TimedWalker(unique = True)
+    tw.initialise()
+    chrons = dict()
+    for count in range(1, 16):
+        tw.iterate()
+        tw.store()
+        chrons[count] = tw._chron.value
+        if count == 12:
+            tw.save()
+    # the chron doubles back, so the latest count is rarely the last:
+    assert list(chrons.values())[:5] == [7.5, 4.5, 1.5, 8.5, 5.5]
+    for bound in (0.5, 1., 1.5, 4., 4.5, 7., 9.5):
+        expected = max(c for c, t in chrons.items() if t <= bound)
+        tw.reset()
+        assert tw.load_latest('chron', bound) == expected
+        assert tw.indices.count == expected and tw.x == expected
+    try:
+        tw.load_latest('chron', 0.)
+        raise AssertionError
+    except IndexerLoadFail:
+        pass
+    # only the saved rows are indexed on disk:
+    rows = [c - 1 for c, t in chrons.items() if c <= 12 and 2. <= t <= 5.]
+    assert list(tw.rows_within('chron', 2., 5.)) == rows
+mpi.message("Checking the joint index...")
+
+count = np.arange(6)
+chron = np.array([0., 2., 1., 5., 3., 4.])
+joint = JointIndex(dict(count = count, chron = chron))
+assert joint.latest('chron', 2.5, 'count') == 2
+assert joint.latest('chron', 3.5, 'count') == 4
+assert joint.latest('chron', 10., 'count') == 5
+try:
+    joint.latest('chron', -1., 'count')
+    raise AssertionError
+except ValueError:
+    pass
+assert list(joint.within('chron', 1., 3.)) == [1, 2, 4]
+assert list(joint.within('count', None, 2)) == [0, 1, 2]
+
+# against brute force, with the sorted columns reused across queries:
+rng = np.random.default_rng(0)
+count = rng.permutation(1000)
+chron = rng.random(1000) * 100.
+joint = JointIndex(dict(count = count, chron = chron))
+for bound in rng.random(50) * 110. - 5.:
+    below = np.flatnonzero(chron <= bound)
+    if len(below):
+        expected = below[np.argmax(count[below])]
+        assert joint.latest('chron', bound, 'count') == expected
+    lo, hi = sorted(rng.random(2) * 100.)
+    expected = np.flatnonzero((chron >= lo) & (chron <= hi))
+    assert list(joint.within('chron', lo, hi)) == list(expected)
+assert list(joint._sortedColumns) == ['chron']
+
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+
+mpi.message("Complete!")
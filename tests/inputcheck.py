@@ -0,0 +1,49 @@
+import os
+import sys
+import shutil
+import subprocess
+
+from everest import mpi
+
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'inputout')
+
+base = """from everest.builts import Built
+class Base(Built):
+    def __init__(self,
+            a = 1,{}
+            **kwargs
+            ):
+        super().__init__(**kwargs)
+"""
+child = """from inputbase import Base
+class Child(Base):
+    pass
+"""
+
+def default_inputs():
+    # in a fresh process, as the persistent caches would see it:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([path, *sys.path])
+    out = subprocess.run(
+        [sys.executable, '-c',
+            'from inputchild import Child; print(dict(Child.defaultInps))'],
+        env = env, check = True, capture_output = True, text = True,
+        )
+    return out.stdout.strip().splitlines()[-1]
+
+mpi.message("Checking inherited inputs follow their base class...")
+
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+    os.makedirs(path)
+    with open(os.path.join(path, 'inputchild.py'), 'w') as file:
+        file.write(child)
+    with open(os.path.join(path, 'inputbase.py'), 'w') as file:
+        file.write(base.format(''))
+    assert default_inputs() == "{'a': 1}"
+    with open(os.path.join(path, 'inputbase.py'), 'w') as file:
+        file.write(base.format('\n            b = 2,'))
+    assert default_inputs() == "{'a': 1, 'b': 2}"
+    shutil.rmtree(path, ignore_errors = True)
+
+mpi.message("Complete!")
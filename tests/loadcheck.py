@@ -0,0 +1,53 @@
+import os
+import gc
+import shutil
+import threading
+
+from everest import mpi
+from everest.comparator import Comparator
+from everest.builts import Built, touch_builts, load_builts
+from everest.builts.examples.pimachine import PiMachine
+
+class Holder(Built):
+    def __init__(self,
+            stop = None,
+            other = None,
+            **kwargs
+            ):
+        super().__init__(**kwargs)
+
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'loadout')
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+    os.makedirs(path)
+
+mpi.message("Checking builts load back with pyklet and built inputs...")
+
+holders = [
+    Holder(stop = Comparator(i, 5, op = 'lt'), other = PiMachine(s = i + 1)) \
+        for i in range(8)
+    ]
+hashIDs = [h.hashID for h in holders]
+expected = [(h.inputs['stop'](), h.inputs['other'].hashID) for h in holders]
+touch_builts(holders, 'frame', path)
+del holders
+gc.collect()
+assert not any(hashID in Holder._prebuilts for hashID in hashIDs)
+
+out = []
+def load():
+    out.extend(load_builts(hashIDs, 'frame', path))
+worker = threading.Thread(target = load, daemon = True)
+worker.start()
+worker.join(30.)
+assert not worker.is_alive(), "Deadlocked resolving inputs."
+assert [h.hashID for h in out] == hashIDs
+assert [(h.inputs['stop'](), h.inputs['other'].hashID) for h in out] \
+    == expected
+# in memory now, so these come back as they are:
+assert all(a is b for a, b in zip(load_builts(hashIDs, 'frame', path), out))
+
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+
+mpi.message("Complete!")
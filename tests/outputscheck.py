@@ -0,0 +1,80 @@
+import os
+import shutil
+
+import numpy as np
+
+from everest import mpi
+from everest import disk
+from everest.anchor import Anchor
+
+from walker import Walker
+
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'outputsout')
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+    os.makedirs(path)
+
+mpi.message("Checking chunked iteration over saved outputs...")
+
+sessions = []
+acquire = disk.SESSIONS.acquire
+def counted(*args, **kwargs):
+    sessions.append(None)
+    return acquire(*args, **kwargs)
+
+with Anchor('outputs', path):
+
+    walker = Walker(size = 3, unique = True)
+    walker.initialise()
+    for i in range(10):
+        walker.iterate()
+        walker.store()
+    walker.save()
+    with disk.H5Wrap(walker.readouts):
+        saved = dict(
+            (k, np.array(walker.readouts[k])) for k in walker.outs.keys()
+            )
+    assert len(saved['count']) == 10 and saved['field'].shape == (10, 3)
+
+    # aligned chunks, the last one short, read in one session:
+    batches = walker.iter_outputs(chunk = 3)
+    disk.SESSIONS.acquire = counted
+    try:
+        batches = list(batches)
+    finally:
+        disk.SESSIONS.acquire = acquire
+    assert len(sessions) == 1
+    assert [len(b['count']) for b in batches] == [3, 3, 3, 1]
+    for k, v in saved.items():
+        assert np.array_equal(np.concatenate([b[k] for b in batches]), v), k
+
+    # bounds, as for slices:
+    for start, stop in [(2, 7), (None, 4), (-4, None), (3, -2), (8, 3)]:
+        rows = slice(start, stop)
+        batches = list(walker.iter_outputs('x', 2, start, stop))
+        got = np.concatenate([b['x'] for b in batches]) \
+            if len(batches) else np.empty(0)
+        assert np.array_equal(got, saved['x'][rows]), rows
+        assert all(list(b) == ['x'] for b in batches)
+
+    # records, keeping each key's dtype and shape:
+    records = np.concatenate(
+        list(walker.iter_outputs(['count', 'field'], 4, structured = True))
+        )
+    assert records.dtype.names == ('count', 'field')
+    assert records['field'].shape == (10, 3)
+    assert records.dtype['count'] == saved['count'].dtype
+    assert np.array_equal(records['count'], saved['count'])
+    assert np.array_equal(records['field'], saved['field'])
+
+    # an iterator left part-way holds its session until closed:
+    batches = walker.iter_outputs(chunk = 3)
+    next(batches)
+    assert disk.SESSIONS.open == 1
+    batches.close()
+    assert disk.SESSIONS.open == 0
+
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+
+mpi.message("Complete!")
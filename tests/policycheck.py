@@ -0,0 +1,105 @@
+import os
+import shutil
+import math
+
+import numpy as np
+
+from everest import mpi
+from everest.anchor import Anchor
+from everest.builts.examples.pimachine import PiMachine
+from everest.comparator import Comparator, Prop
+from everest.policies import \
+    StoragePolicy, Every, LogSpaced, When, Retention, PolicyMissingMethod
+
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'policyout')
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+    os.makedirs(path)
+
+mpi.message("Checking storage policies...")
+
+def stored_counts(pm):
+    return [int(c) for c in pm.outs.stored['count']]
+
+def run(pm, steps, every = 1):
+    pm.reset()
+    pm.clear(silent = True)
+    pm.store()
+    for i in range(steps // every):
+        pm.iterate(every)
+        pm.store()
+
+try:
+    StoragePolicy()(PiMachine())
+    raise AssertionError
+except PolicyMissingMethod:
+    pass
+
+pm = PiMachine(unique = True)
+pm.set_policies(Every(7))
+run(pm, 50)
+assert stored_counts(pm) == list(range(0, 50, 7))
+
+# Log spacing holds however sparsely the producer stores:
+N = 100000
+for every in (1, 10):
+    pm = PiMachine(unique = True)
+    pm.set_policies(LogSpaced(perDecade = 10))
+    run(pm, N, every)
+    counts = stored_counts(pm)
+    expected = [0, *sorted(set(
+        math.floor(math.log10(c) * 10 + 1e-9) for c in range(every, N + 1, every)
+        ))]
+    assert len(counts) == len(expected), (every, len(counts), len(expected))
+    assert len(counts) > 30
+    bins = [math.floor(math.log10(c) * 10 + 1e-9) for c in counts[1:]]
+    assert bins == sorted(set(bins))
+
+# Copies of one producer keep their own bins:
+first, second = PiMachine(unique = True), PiMachine(unique = True)
+policy = LogSpaced()
+first.set_policies(policy)
+second.set_policies(policy)
+run(first, 100)
+run(second, 100)
+assert stored_counts(first) == stored_counts(second)
+
+pm = PiMachine(unique = True)
+pm.set_policies(When(Comparator(Prop(None, 'state'), 3.14, op = 'ge')))
+run(pm, 5)
+assert all(v >= 3.14 for v in pm.outs.stored['pi'])
+assert stored_counts(pm) == [1, 2, 3, 4, 5]
+
+mpi.message("Checking retention...")
+
+tiers = Retention((10, 1), (50, 5), (None, 25))
+values = np.arange(101)
+keep = tiers(values)
+ages = 100 - values
+assert keep[ages < 10].all()
+assert (keep[(ages >= 10) & (ages < 60)] \
+    == (values[(ages >= 10) & (ages < 60)] % 5 == 0)).all()
+assert (keep[ages >= 60] == (values[ages >= 60] % 25 == 0)).all()
+assert not len(Retention((None, 1))(np.arange(0)))
+
+pm = PiMachine(unique = True)
+pm.set_policies(retention = Retention((10, 1), (None, 10)))
+with Anchor('retention', path):
+    pm.reset()
+    for i in range(5):
+        for j in range(10):
+            pm.iterate()
+            pm.store()
+        pm.save()
+    counts = [int(c) for c in pm.readouts['count']]
+    assert counts == [10, 20, 30, 40, 41, 42, 43, 44, 45, 46, 47, 48, 49, 50]
+    pis = pm.readouts['pi']
+    assert len(pis) == len(counts)
+    # the rows kept are the rows of those counts:
+    pm.load(30)
+    assert pm.state == pis[2]
+
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+
+mpi.message("Complete!")
@@ -0,0 +1,70 @@
+import gc
+import weakref
+
+from everest import mpi
+from everest.builts import Built, Meta, set_cache, cache_stats
+
+from walker import Walker
+
+class Thing(Built):
+    def __init__(self,
+            a = 0,
+            **kwargs
+            ):
+        super().__init__(**kwargs)
+
+def freed(ref):
+    gc.collect()
+    return ref() is None
+
+mpi.message("Checking the cache of recently used builts...")
+
+# Off by default, so that a dropped built is freed at once:
+thing = Thing(1)
+ref = weakref.ref(thing)
+del thing
+assert freed(ref)
+assert cache_stats()['size'] == 0 and cache_stats()['evictions'] == 0
+
+# Bounded by count, the least recently used are let go first:
+set_cache(2, None)
+refs = [weakref.ref(Thing(a)) for a in range(3)]
+assert [freed(ref) for ref in refs] == [True, False, False]
+assert cache_stats()['evictions'] == 1
+hits = cache_stats()['hits']
+assert Thing(1) is refs[1]()
+assert cache_stats()['hits'] == hits + 1
+# now Thing(2) is the least recent:
+Thing(3)
+assert [freed(ref) for ref in refs] == [True, False, True]
+# live but uncached builts are still found, as misses:
+held = Thing(4)
+Thing(5), Thing(6)
+assert not held.hashID in Meta._recent
+misses = cache_stats()['misses']
+assert Thing(4) is held
+assert cache_stats()['misses'] == misses + 1
+set_cache(0)
+assert cache_stats()['size'] == 0
+assert freed(refs[1])
+
+# Bounded by bytes, as re-measured whenever an entry is used:
+set_cache(None, 2 ** 30)
+small, large = Walker(size = 100), Walker(size = 1000)
+for walker in (small, large):
+    walker.iterate()
+    walker.store()
+    assert Walker(size = len(walker.field)) is walker
+assert cache_stats()['nbytes'] == small.nbytes + large.nbytes
+set_cache(None, large.nbytes)
+assert not small.hashID in Meta._recent and large.hashID in Meta._recent
+assert cache_stats()['nbytes'] == large.nbytes
+set_cache(None, large.nbytes - 1)
+assert cache_stats()['size'] == 0
+ref = weakref.ref(large)
+del walker, large
+assert freed(ref)
+
+set_cache(0)
+
+mpi.message("Complete!")
@@ -0,0 +1,154 @@
+import os
+import sys
+import shutil
+import importlib
+import subprocess
+
+from everest import mpi
+from everest import cache
+from everest.builts import ScriptChangedError, _SCRIPTCACHE
+from everest.globevars import _SCRIPTSDIR_
+from everest.scripts import ScriptStore, ScriptMismatch
+
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scriptout')
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+    os.makedirs(path)
+mpi.comm.barrier()
+sys.path.insert(0, path)
+
+source = '''from everest.builts import Built
+class Thing(Built):
+    def __init__(self,
+            a = {},
+            **kwargs
+            ):
+        super().__init__(**kwargs)
+
+CLASS = Thing
+'''
+
+def write_module(modname, a):
+    if mpi.rank == 0:
+        with open(os.path.join(path, modname + '.py'), 'w') as file:
+            file.write(source.format(a))
+    mpi.comm.barrier()
+
+def edit_module(modname):
+    # a different size, so that the file stamp changes too:
+    if mpi.rank == 0:
+        with open(os.path.join(path, modname + '.py'), 'a') as file:
+            file.write('# edited\n')
+    mpi.comm.barrier()
+
+mpi.message("Checking class scripts against later edits...")
+
+# Defined from a file not seen before: the script read then is kept.
+write_module('fresh', 1)
+Fresh = importlib.import_module('fresh').Thing
+edit_module('fresh')
+assert Fresh.script == source.format(1)
+
+def import_elsewhere(modname):
+    # caches the file stamp from another process
+    if mpi.rank == 0:
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([path, *sys.path])
+        subprocess.run(
+            [sys.executable, '-c', 'import ' + modname],
+            env = env, check = True,
+            )
+    mpi.comm.barrier()
+
+# Defined from a cached file stamp: the script is read when needed,
+# falling back to the copy saved with the stamp if the file has changed.
+write_module('stamped', 2)
+import_elsewhere('stamped')
+Stamped = importlib.import_module('stamped').Thing
+assert cache.CACHEACTIVE <= (not '_script' in Stamped.__dict__)
+edit_module('stamped')
+assert Stamped.script == source.format(2)
+framePath = os.path.join(path, 'frames')
+Stamped(1).touch('frame', framePath)
+stored = os.path.join(framePath, _SCRIPTSDIR_, Stamped._scriptDigest + '.py')
+if mpi.rank == 0:
+    with open(stored) as file:
+        assert file.read() == source.format(2)
+
+# Only with that copy lost too is the script refused:
+write_module('lost', 3)
+import_elsewhere('lost')
+Lost = importlib.import_module('lost').Thing
+if cache.CACHEACTIVE:
+    _SCRIPTCACHE._memo.pop(Lost._scriptDigest, None)
+    if mpi.rank == 0:
+        os.remove(_SCRIPTCACHE._filename(Lost._scriptDigest))
+    mpi.comm.barrier()
+    edit_module('lost')
+    try:
+        Lost.script
+        raise AssertionError("A changed script was accepted.")
+    except ScriptChangedError:
+        pass
+    try:
+        Lost(1).touch('frame', framePath)
+        raise AssertionError("A changed script was written.")
+    except ScriptChangedError:
+        pass
+    assert not os.path.exists(
+        os.path.join(framePath, _SCRIPTSDIR_, Lost._scriptDigest + '.py')
+        )
+
+# Nor can a script be stored under another's digest:
+class Forged:
+    script = source.format(3)
+    digest = cache.digest(source.format(4))
+store = ScriptStore(os.path.join(path, 'store'))
+try:
+    store.add(Forged)
+    raise AssertionError("A forged script was stored.")
+except ScriptMismatch:
+    pass
+assert not Forged.digest in store
+
+mpi.message("Checking class scripts round-trip through frames...")
+
+write_module('roundtrip', 5)
+RoundTrip = importlib.import_module('roundtrip').Thing
+RoundTrip(1).touch('frame', framePath)
+stored = os.path.join(framePath, _SCRIPTSDIR_, RoundTrip._scriptDigest + '.py')
+if mpi.rank == 0:
+    with open(stored) as file:
+        assert file.read() == source.format(5)
+
+def load_elsewhere(framePath):
+    # in a fresh process that has never imported the class:
+    if mpi.rank == 0:
+        code = '; '.join([
+            'from everest.builts import load_class',
+            'cls = load_class(%r, "frame", %r)' % (
+                RoundTrip.typeHash, framePath
+                ),
+            'assert cls.typeHash == %r' % RoundTrip.typeHash,
+            'assert cls(1).hashID == %r' % RoundTrip(1).hashID,
+            ])
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(sys.path[1:])
+        subprocess.run(
+            [sys.executable, '-c', code],
+            env = env, check = True, cwd = os.path.dirname(path),
+            )
+    mpi.comm.barrier()
+
+load_elsewhere(framePath)
+movedPath = os.path.join(path, 'moved')
+if mpi.rank == 0:
+    shutil.move(framePath, movedPath)
+mpi.comm.barrier()
+load_elsewhere(movedPath)
+
+sys.path.remove(path)
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+
+mpi.message("Complete!")
@@ -0,0 +1,85 @@
+import os
+import shutil
+
+import numpy as np
+
+from everest import mpi
+from everest.anchor import Anchor
+from everest.builts import set_memory_budget, memory_usage
+from everest.builts._producer import Outs
+
+from walker import Walker
+
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'spillout')
+scratch = os.path.join(path, 'scratch')
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+    os.makedirs(path)
+
+mpi.message("Checking outputs spilled to scratch files...")
+
+size = 1000
+spilled = Walker(size = size, unique = True)
+spilled.spill(path = scratch)
+kept = Walker(size = size, unique = True)
+for walker in (spilled, kept):
+    walker.iterate()
+    walker.store()
+column = spilled.outs.stored['field']
+assert isinstance(column._buffer, np.memmap)
+assert not isinstance(kept.outs.stored['field']._buffer, np.memmap)
+# the scratch files are unlinked as soon as they are mapped:
+assert not len(os.listdir(scratch))
+
+# Later stores outgrow the first buffers and are kept all the same:
+for i in range(40):
+    for walker in (spilled, kept):
+        walker.iterate()
+        walker.store()
+assert len(spilled.outs) == len(kept.outs) == 41
+assert isinstance(column._buffer, np.memmap)
+for k in spilled.outs.keys():
+    assert np.array_equal(
+        spilled.outs.stored[k].view, kept.outs.stored[k].view
+        ), k
+assert spilled.nbytes == kept.nbytes
+
+# Only what is held in RAM counts against the memory budget:
+hashnbytes = len(spilled.outs) * Outs._hashnbytes
+assert spilled.ramnbytes == hashnbytes
+assert kept.ramnbytes == kept.nbytes > hashnbytes
+producers = dict(
+    (nbytes, hashID) for hashID, nbytes in memory_usage()['producers']
+    )
+assert hashnbytes in producers and kept.nbytes in producers
+kept.clear()
+# (another size, so as not to share the spilled walker's frame)
+other = Walker(size = 2 * size, unique = True)
+other.iterate()
+other.store()
+with Anchor('spill', path):
+    set_memory_budget(other.nbytes + 2 * hashnbytes)
+    spilled.iterate()
+    spilled.store()
+    # so far within budget, with nothing saved:
+    assert len(spilled.outs) == 42 and len(other.outs) == 1
+    other.iterate()
+    other.store()
+    assert not len(other.outs) and len(spilled.outs) == 42
+    set_memory_budget(None)
+    spilled.save()
+    assert not len(spilled.outs) and spilled.ramnbytes == 0
+    assert np.array_equal(spilled.readouts['field'][-1], spilled.field)
+    assert len(spilled.readouts['count']) == 42
+
+# Turned off, the spilled buffers return to RAM once cleared:
+spilled.spill(False)
+spilled.iterate()
+spilled.store()
+assert not isinstance(spilled.outs.stored['field']._buffer, np.memmap)
+assert spilled.ramnbytes == spilled.nbytes
+
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+
+mpi.message("Complete!")
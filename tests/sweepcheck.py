@@ -0,0 +1,41 @@
+import numpy as np
+
+from everest import mpi
+from everest.builts import Built
+
+class Point(Built):
+    def __init__(self,
+            a = 0,
+            b = 0.,
+            c = None,
+            **kwargs
+            ):
+        super().__init__(**kwargs)
+
+mpi.message("Checking that sweeps build the same builts as single calls...")
+
+arr = np.arange(4.)
+space = {
+    'a': [1, 1., True, 2],
+    'b': [0., -0., arr, frozenset([1, 2])],
+    'c': [None, (1, 2), Point(a = 9)],
+    }
+
+vectors = list(Point[space].vectors)
+# repeated vectors are built once and returned as often as asked for:
+vectors += vectors[:5]
+swept = Point.build_many(vectors)
+assert len(swept) == len(vectors)
+for vector, built in zip(vectors, swept):
+    assert Point(**vector) is built, vector
+    assert Point(unique = True, **vector).hashID == built.hashID, vector
+assert all(a is b for a, b in zip(swept[-5:], swept[:5]))
+# values that hash alike (1, 1. and True; 0. and -0.) stay distinct:
+assert len(set(built.hashID for built in swept)) \
+    == len(set(id(built) for built in swept)) == 48
+
+# once held, the same sweep retrieves rather than rebuilds:
+assert all(a is b for a, b in zip(Point.build_many(vectors), swept))
+assert all(a is b for a, b in zip(Point[space].build(), swept))
+
+mpi.message("Complete!")
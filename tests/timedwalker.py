@@ -0,0 +1,23 @@
+from everest.builts._chroner import Chroner
+
+from walker import Walker
+
+class TimedWalker(Walker, Chroner):
+    '''
+    A Walker whose chron jumps back and forth as it steps, \
+    so that the latest count by a given chron is not the last.
+    '''
+    def __init__(self,
+            # params
+            size = 0,
+            # configs (_ghost_)
+            x = 0.,
+            y = 0.,
+            # misc
+            **kwargs
+            ):
+        super().__init__(**kwargs)
+    def _iterate(self):
+        super()._iterate()
+        # (never zero once stepped, which would read as initialised)
+        self._chron.value = self._count.value * 7 % 10 + 0.5
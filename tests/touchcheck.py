@@ -0,0 +1,60 @@
+import os
+import shutil
+
+from everest import mpi
+from everest.anchor import Anchor
+from everest.writer import Writer
+from everest.builts import touch_builts, load_built
+from everest.builts.examples.pimachine import PiMachine
+
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'touchout')
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+    os.makedirs(path)
+
+# counts the records written through writers:
+written = []
+add_dict = Writer.add_dict
+def counted(self, inDict, *names):
+    written.append(inDict)
+    return add_dict(self, inDict, *names)
+Writer.add_dict = counted
+
+mpi.message("Checking that builts are written to a frame once...")
+
+pm = PiMachine(s = 2)
+pm.touch('first', path)
+assert len(written)
+del written[:]
+pm.touch('first', path)
+assert not len(written)
+# another frame is written to afresh:
+pm.touch('second', path)
+assert len(written)
+for name in ('first', 'second'):
+    assert load_built(pm.hashID, name, path) is pm
+
+many = [PiMachine(s = s) for s in range(3, 8)]
+touch_builts(many, 'first', path)
+del written[:]
+for built in many:
+    built.touch('first', path)
+assert not len(written)
+
+# saving touches the producer, which is then only looked up:
+with Anchor('first', path):
+    pm.iterate(3)
+    pm.store()
+    del written[:]
+    pm.save()
+    assert not any('typeHash' in d for d in written)
+    pm.reset()
+    pm.load(3)
+    assert pm.indices.count == 3
+
+Writer.add_dict = add_dict
+
+if mpi.rank == 0:
+    shutil.rmtree(path, ignore_errors = True)
+
+mpi.message("Complete!")
@@ -0,0 +1,41 @@
+import numpy as np
+
+from everest.builts._wanderer import Wanderer, StateVar
+
+class Walker(Wanderer):
+    '''
+    Steps x up and y down by one per iteration; \
+    if 'size' is given, also churns a field of that many floats.
+    '''
+    def __init__(self,
+            # params
+            size = 0,
+            # configs (_ghost_)
+            x = 0.,
+            y = 0.,
+            # misc
+            **kwargs
+            ):
+        self.x, self.y = np.array(0.), np.array(0.)
+        self.field = np.zeros(size)
+        super().__init__(**kwargs)
+        self.mutables['x'] = StateVar(self, 'x')
+        self.mutables['y'] = StateVar(self, 'y')
+    def _out(self):
+        outs = super()._out()
+        outs['x'], outs['y'] = self.x.copy(), self.y.copy()
+        if len(self.field):
+            outs['field'] = self.field.copy()
+        return outs
+    def _load_process(self, outs):
+        outs = super()._load_process(outs)
+        self.x[...], self.y[...] = outs.pop('x'), outs.pop('y')
+        if len(self.field):
+            self.field = np.array(outs.pop('field'))
+        return outs
+    def _iterate(self):
+        self.x += 1.
+        self.y -= 1.
+        if len(self.field):
+            self.field = np.sin(self.field + self.x) ** 2
+        super()._iterate()
@@ -6,10 +6,12 @@ import numpy as np
 import hashlib
 import warnings
 import random
+import os
 
 from . import mpi
 message = mpi.message
 from . import wordhash
+from .hashing import content_digest
 
 from .exceptions import EverestException
 class GrouperSetAttrForbidden(EverestException):
@@ -139,12 +141,31 @@ def make_hash(obj):
         hashVal = str(int(hexID, 16))
     return hashVal
 
+# Legacy IDs reproduce the words drawn by reseeding on make_hash,
+# as used by frames written before digest-indexed IDs.
+# Fixed at import, since classes take their typeHash when defined:
+LEGACYIDS = bool(os.environ.get('EVEREST_LEGACYIDS', ''))
+
 def w_hash(obj):
-    return wordhash.get_random_phrase(
-        randomseed = make_hash(obj),
+    if LEGACYIDS:
+        return wordhash.get_random_phrase(
+            randomseed = make_hash(obj),
+            wordlength = 2,
+            phraselength = 2,
+            )
+    return wordhash.get_digest_phrase(
+        content_digest(obj),
         wordlength = 2,
         phraselength = 2,
         )
+def english_hash(obj, n = 1):
+    if LEGACYIDS:
+        return wordhash.get_random_english(n, randomseed = make_hash(obj))
+    return wordhash.get_digest_english(content_digest(obj), n)
+def proper_hash(obj, n = 1):
+    if LEGACYIDS:
+        return wordhash.get_random_proper(n, randomseed = make_hash(obj))
+    return wordhash.get_digest_proper(content_digest(obj), n)
 class HashIDNotFound(EverestException):
     pass
 def get_hash(obj, make = True):
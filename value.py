@@ -74,6 +74,17 @@ class Value:
     def __sub__(self, arg): return self._operate(arg, 'sub')
     def __truediv__(self, arg): return self._operate(arg, 'truediv')
 
+    def increment(self, n = 1):
+        '''
+        Adds 'n' in place; a fast path for counting that skips \
+        the type checks of an ordinary assignment.
+        '''
+        if self.null: raise NullValueDetected(self, self.value)
+        plain = self.plain + n
+        dict.__setattr__(self, 'plain', plain)
+        dict.__setattr__(self, 'value', self.type(plain))
+        return self
+
     def _reassign(self, arg, opkey):
         self.value = self._operate(arg, opkey)
         return self
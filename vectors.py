@@ -19,8 +19,15 @@ class SchemaIterator:
             ):
         self.schema = schema
         self.space = space
+    @property
+    def vectors(self):
+        return VectorSet(**self.space)
     def __iter__(self):
-        self.space = iter(VectorSet(**self.space))
+        self._vectors = iter(self.vectors)
         return self
     def __next__(self):
-        return self.schema(**next(self.space))
+        return self.schema(**next(self._vectors))
+    def build(self):
+        return self.schema.build_many(self.vectors)
+    def touch(self, name = None, path = None):
+        return self.schema.touch_many(self.vectors, name, path)
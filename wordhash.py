@@ -1,18 +1,148 @@
 import random
 import os
 import string
+import hashlib
+import mmap
+import tempfile
+import threading
+from collections.abc import Sequence
+from functools import lru_cache
+
+from .cache import CACHEDIR
 
 parentPath = os.path.abspath(os.path.dirname(__file__))
 namesDir = os.path.join(parentPath, '_namesources')
 pathFn = lambda n: os.path.join(namesDir, n)
 
-with open(pathFn('cities.txt'), mode = 'r') as file:
-    CITIES = file.read().split('\n')
-with open(pathFn('english_words.txt'), mode = 'r') as file:
-    ENGLISH = file.read().split('\n')
-with open(pathFn('names.txt'), mode = 'r') as file:
-    NAMES = file.read().split('\n')
-PROPER = sorted(set([*CITIES, *NAMES]))
+class WordTable(Sequence):
+    '''
+    A read-only sequence of words backed by a memory-mapped binary file: \
+    a header, (n + 1) little-endian uint64 offsets, then the packed \
+    utf-8 words. Words are only decoded when indexed.
+    '''
+    _MAGIC = b'EVWT0001'
+    _HEADER = len(_MAGIC) + 8
+    def __init__(self, filename):
+        with open(filename, 'rb') as file:
+            self._mm = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+        if not self._mm[:len(self._MAGIC)] == self._MAGIC:
+            raise ValueError("Not a word table: " + filename)
+        self._len = self._offset(-1)
+        self._dataStart = self._HEADER + 8 * (self._len + 1)
+    def _offset(self, i):
+        pos = self._HEADER + 8 * i
+        return int.from_bytes(self._mm[pos : pos + 8], 'little')
+    def __len__(self):
+        return self._len
+    def __getitem__(self, i):
+        if type(i) is slice:
+            return [self[j] for j in range(*i.indices(self._len))]
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError(i)
+        pos = self._HEADER + 8 * i
+        start, stop = (
+            int.from_bytes(self._mm[pos : pos + 8], 'little'),
+            int.from_bytes(self._mm[pos + 8 : pos + 16], 'little'),
+            )
+        return self._mm[
+            self._dataStart + start : self._dataStart + stop
+            ].decode()
+    @classmethod
+    def compile(cls, words, filename):
+        encoded = [word.encode() for word in words]
+        offsets = [0]
+        for word in encoded:
+            offsets.append(offsets[-1] + len(word))
+        dirname = os.path.dirname(filename)
+        os.makedirs(dirname, exist_ok = True)
+        fd, tempname = tempfile.mkstemp(dir = dirname, suffix = '.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(cls._MAGIC)
+                file.write(len(encoded).to_bytes(8, 'little'))
+                file.write(b''.join(o.to_bytes(8, 'little') for o in offsets))
+                file.write(b''.join(encoded))
+            os.replace(tempname, filename)
+        except BaseException:
+            os.remove(tempname)
+            raise
+
+def _read_source(name):
+    with open(pathFn(name), mode = 'r') as file:
+        return file.read().split('\n')
+
+def _source_stamp(*names):
+    if not len(names):
+        # Generated tables: bump if the generator changes.
+        return 'v1'
+    stats = [os.stat(pathFn(name)) for name in names]
+    return '-'.join(
+        str(n) for st in stats for n in (st.st_mtime_ns, st.st_size)
+        )
+
+# name: (source files, builder)
+_TABLESOURCES = {
+    'CITIES': (
+        ('cities.txt',),
+        lambda: _read_source('cities.txt'),
+        ),
+    'ENGLISH': (
+        ('english_words.txt',),
+        lambda: _read_source('english_words.txt'),
+        ),
+    'NAMES': (
+        ('names.txt',),
+        lambda: _read_source('names.txt'),
+        ),
+    'PROPER': (
+        ('cities.txt', 'names.txt'),
+        lambda: sorted(set([
+            *_read_source('cities.txt'), *_read_source('names.txt')
+            ])),
+        ),
+    'SYLLABLES': ((), lambda: _make_syllables()),
+    }
+_TABLES = dict()
+_TABLESLOCK = threading.Lock()
+
+def get_table(name):
+    try:
+        return _TABLES[name]
+    except KeyError:
+        pass
+    with _TABLESLOCK:
+        if not name in _TABLES:
+            _TABLES[name] = _load_table(name)
+    return _TABLES[name]
+
+def _load_table(name):
+    sources, builder = _TABLESOURCES[name]
+    filename = os.path.join(
+        CACHEDIR,
+        'wordtables',
+        '-'.join([name.lower(), _source_stamp(*sources)]) + '.tbl',
+        )
+    try:
+        return WordTable(filename)
+    except (OSError, ValueError):
+        pass
+    words = builder()
+    try:
+        WordTable.compile(words, filename)
+        return WordTable(filename)
+    except (OSError, ValueError):
+        # No usable cache directory: keep the table in memory.
+        return words
+
+def __getattr__(name):
+    # Word tables are loaded on first use rather than at import:
+    if name in _TABLESOURCES:
+        return get_table(name)
+    raise AttributeError(
+        "module " + repr(__name__) + " has no attribute " + repr(name)
+        )
 
 GREEK = [
     'alpha',
@@ -99,13 +229,12 @@ class Reseed:
 
 from functools import wraps
 def reseed(func):
+    # Draws from a private generator seeded with 'randomseed',
+    # which yields the same words as reseeding the global 'random'
+    # but is thread-safe and leaves the user's random state alone.
     @wraps(func)
     def wrapper(*args, randomseed = None, **kwargs):
-        if Reseed.active:
-            return func(*args, **kwargs)
-        else:
-            with Reseed(randomseed):
-                return func(*args, **kwargs)
+        return func(*args, rng = random.Random(randomseed), **kwargs)
     return wrapper
 
 def _make_syllables():
@@ -140,69 +269,98 @@ def _make_syllables():
     syllables = list(sorted(set(syllables)))
     return syllables
 
-SYLLABLES = _make_syllables()
-
-def random_syllable():
-    syllable = random.choice(SYLLABLES)
+def random_syllable(rng = random):
+    syllable = rng.choice(get_table('SYLLABLES'))
     return syllable
 
-def random_word(length = 3):
+def random_word(length = 3, rng = random):
     outWord = ''
     for _ in range(length):
-        outWord += random_syllable()
+        outWord += random_syllable(rng = rng)
     return outWord
 
-def random_alphanumeric(length = 6):
+def random_alphanumeric(length = 6, rng = random):
     characters = 'abcdefghijklmnopqrstuvwxyz0123456789'
-    choices = [random.choice(characters) for i in range(length)]
+    choices = [rng.choice(characters) for i in range(length)]
     return ''.join(choices)
 
 @reseed
-def get_random_alphanumeric(**kwargs):
-    return random_alphanumeric(**kwargs)
+def get_random_alphanumeric(rng = random, **kwargs):
+    return random_alphanumeric(rng = rng, **kwargs)
 
 @reseed
-def get_random_word(*args, **kwargs):
-    return random_word(*args, **kwargs)
+def get_random_word(*args, rng = random, **kwargs):
+    return random_word(*args, rng = rng, **kwargs)
 
 @reseed
-def get_random_phrase(phraselength = 2, wordlength = 2):
+def get_random_phrase(phraselength = 2, wordlength = 2, rng = random):
     # 2 * 2 yields 64 bits of entropy
     phraseList = []
     for _ in range(phraselength):
         phraseList.append(
-            random_word(wordlength)
+            random_word(wordlength, rng = rng)
             )
     phrase = "-".join(phraseList)
     return phrase
 
 @reseed
-def get_random_english(n = 1):
-    return '-'.join([random.choice(ENGLISH) for i in range(n)])
+def get_random_english(n = 1, rng = random):
+    return '-'.join([rng.choice(get_table('ENGLISH')) for i in range(n)])
 @reseed
-def get_random_numerical(n = 1):
-    return ''.join([random.choice(string.digits) for _ in range(n)])
+def get_random_numerical(n = 1, rng = random):
+    return ''.join([rng.choice(string.digits) for _ in range(n)])
 @reseed
-def get_random_greek(n = 1):
-    return '-'.join([random.choice(GREEK) for i in range(n)])
+def get_random_greek(n = 1, rng = random):
+    return '-'.join([rng.choice(GREEK) for i in range(n)])
 @reseed
-def get_random_city(n = 1):
-    return '-'.join([random.choice(CITIES) for i in range(n)])
+def get_random_city(n = 1, rng = random):
+    return '-'.join([rng.choice(get_table('CITIES')) for i in range(n)])
 @reseed
-def get_random_phonetic(n = 1):
-    return '-'.join([random.choice(PHONETIC) for i in range(n)])
+def get_random_phonetic(n = 1, rng = random):
+    return '-'.join([rng.choice(PHONETIC) for i in range(n)])
 @reseed
-def get_random_codeword(n = 1):
-    return '-'.join([random.choice(CODEWORDS) for i in range(n)])
+def get_random_codeword(n = 1, rng = random):
+    return '-'.join([rng.choice(CODEWORDS) for i in range(n)])
 @reseed
-def get_random_wordnum(n = 1):
-    return '-'.join([random.choice(WORDNUMS) for i in range(n)])
+def get_random_wordnum(n = 1, rng = random):
+    return '-'.join([rng.choice(WORDNUMS) for i in range(n)])
 @reseed
-def get_random_name(n = 1):
-    return '-'.join([random.choice(NAMES) for i in range(n)])
+def get_random_name(n = 1, rng = random):
+    return '-'.join([rng.choice(get_table('NAMES')) for i in range(n)])
 @reseed
-def get_random_proper(n = 1):
-    return '-'.join([random.choice(PROPER) for i in range(n)])
+def get_random_proper(n = 1, rng = random):
+    return '-'.join([rng.choice(get_table('PROPER')) for i in range(n)])
 @reseed
-def get_random_cityword():
-    return '-'.join([random.choice(s) for s in [CITIES, WORDS]])
+def get_random_cityword(rng = random):
+    return '-'.join([rng.choice(s) for s in [get_table('CITIES'), WORDS]])
+
+def _digest_indices(digest, count, size):
+    # Four bytes of digest per index, stretched if more are needed.
+    stream = digest
+    while len(stream) < 4 * count:
+        stream += hashlib.blake2b(stream, digest_size = 64).digest()
+    return [
+        int.from_bytes(stream[4 * i : 4 * (i + 1)], 'big') % size
+            for i in range(count)
+        ]
+
+@lru_cache(maxsize = 4096)
+def get_digest_phrase(digest, phraselength = 2, wordlength = 2):
+    syllables = get_table('SYLLABLES')
+    indices = iter(
+        _digest_indices(digest, phraselength * wordlength, len(syllables))
+        )
+    return '-'.join([
+        ''.join([syllables[next(indices)] for _ in range(wordlength)])
+            for _ in range(phraselength)
+        ])
+@lru_cache(maxsize = 4096)
+def get_digest_english(digest, n = 1):
+    english = get_table('ENGLISH')
+    indices = _digest_indices(digest, n, len(english))
+    return '-'.join([english[i] for i in indices])
+@lru_cache(maxsize = 4096)
+def get_digest_proper(digest, n = 1):
+    proper = get_table('PROPER')
+    indices = _digest_indices(digest, n, len(proper))
+    return '-'.join([proper[i] for i in indices])
@@ -13,9 +13,11 @@ H5Manager = disk.H5Manager
 from . import mpi
 from .pyklet import Pyklet
 from .globevars import \
-    _BUILTTAG_, _CLASSTAG_, _BYTESTAG_, _STRINGTAG_, _EVALTAG_
+    _BUILTTAG_, _CLASSTAG_, _BYTESTAG_, _STRINGTAG_, _EVALTAG_, _SCRIPTTAG_, \
+    _INDEXTAG_
 from .array import EverestArray
 from .utilities import Grouper
+from .scripts import ClassScript, get_script_store
 
 
 class LinkTo:
@@ -53,6 +55,12 @@ class Writer(H5Manager):
                     for key, val in sorted(inp.items())
                 }
             raise TypeError
+        elif type(inp) is ClassScript:
+            store = get_script_store(self.path)
+            if store is None:
+                return _STRINGTAG_ + inp.script
+            store.add(inp)
+            return _SCRIPTTAG_ + inp.digest
         elif type(inp) is LinkTo:
             inp.arg.touch(self.name, self.path)
             return inp
@@ -95,7 +103,84 @@ class Writer(H5Manager):
     def add(self, item, name, *names):
         names = [self.cwd, *names]
         processed = self._process_inp(item)
-        self._add_wrapped(processed, name, *names)
+        deferred = disk.DeferredWrites.get_active()
+        if deferred is None:
+            self._add_wrapped(processed, name, *names)
+        else:
+            deferred.add(self, self._add_wrapped, processed, name, *names)
+
+    @disk.h5filewrap
+    def retain(self, keep, key, names):
+        '''
+        Thins the aligned datasets 'names' under the current directory \
+        to the rows selected by the boolean mask keep(values of 'key').
+        '''
+        deferred = disk.DeferredWrites.get_active()
+        if deferred is None:
+            self._retain_wrapped(keep, key, names)
+        else:
+            deferred.add(self, self._retain_wrapped, keep, key, names)
+
+    @mpi.dowrap
+    def _retain_wrapped(self, keep, key, names):
+        group = self.h5file[self.cwd]
+        mask = np.asarray(keep(group[key][...]), dtype = bool)
+        dropped = np.flatnonzero(~mask)
+        if not len(dropped):
+            return
+        # Rows before the first dropped row are left untouched:
+        first = dropped[0]
+        for name in names:
+            dataset = group[name]
+            tail = dataset[first:][mask[first:]]
+            dataset[first : first + len(tail)] = tail
+            dataset.resize(first + len(tail), axis = 0)
+        # Row positions have moved, so any sorted indices are stale:
+        if _INDEXTAG_ in group:
+            del group[_INDEXTAG_]
+
+    @disk.h5filewrap
+    def reindex(self, key):
+        '''
+        Brings the sorted index of the dataset 'key' under the current \
+        directory up to date: rows added since the last call are \
+        appended if they keep it sorted, else the index is rebuilt.
+        '''
+        deferred = disk.DeferredWrites.get_active()
+        if deferred is None:
+            self._reindex_wrapped(key)
+        else:
+            deferred.add(self, self._reindex_wrapped, key)
+
+    @mpi.dowrap
+    def _reindex_wrapped(self, key):
+        group = self.h5file[self.cwd]
+        column = group[key]
+        index = group.require_group(os.path.join(_INDEXTAG_, key))
+        length = len(column)
+        if 'values' in index:
+            values, rows = index['values'], index['rows']
+            indexed = len(values)
+            if indexed == length:
+                return
+            if indexed < length:
+                new = column[indexed:]
+                if np.all(new[1:] >= new[:-1]) \
+                        and (indexed == 0 or new[0] >= values[-1]):
+                    values.resize(length, axis = 0)
+                    rows.resize(length, axis = 0)
+                    values[indexed:] = new
+                    rows[indexed:] = np.arange(indexed, length)
+                    return
+            del index['values'], index['rows']
+        full = column[...]
+        order = np.argsort(full, kind = 'stable')
+        index.create_dataset(
+            'values', data = full[order], maxshape = (None, *full.shape[1:])
+            )
+        index.create_dataset(
+            'rows', data = order.astype(np.int64), maxshape = (None,)
+            )
 
     @mpi.dowrap
     def _add_wrapped(self, item, name, *names):